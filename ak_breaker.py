@@ -0,0 +1,72 @@
+# ak_breaker.py — circuit breaker для внешнего бэкенда (Glosbe)
+from __future__ import annotations
+
+import time
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """
+    closed    — запросы идут, подряд идущие сбои считаются;
+    open      — после failure_threshold сбоев подряд всё отклоняется сразу (fail fast)
+                до истечения reset_timeout;
+    half_open — пропускаем не больше half_open_max пробных запросов: успех закрывает
+                цепь, сбой снова открывает её.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self.stats = {"rejected": 0, "opened": 0, "successes": 0, "failures": 0}
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max:
+                self.stats["rejected"] += 1
+                return False
+            self._probes += 1
+        return True
+
+    def record_success(self) -> None:
+        self.stats["successes"] += 1
+        self.failures = 0
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.stats["failures"] += 1
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.stats["opened"] += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Пробный запрос прервался без вердикта (отмена или вылетевшее исключение) — освобождаем слот."""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def snapshot(self) -> dict:
+        retry_in = 0.0
+        if self.state == OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "retry_in": round(retry_in, 3),
+            **self.stats,
+        }
@@ -0,0 +1,174 @@
+# ak_cache.py — двухуровневый кэш переводов: LRU в памяти + SQLite на диске
+from __future__ import annotations
+
+import json as _json
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+
+_WS_RE = re.compile(r"\s+")
+
+
+def make_key(text: str, src: str, dst: str) -> str:
+    """Нормализованный ключ (text, src, dst): регистр и пробелы не важны."""
+    return f"{src}:{dst}:{_WS_RE.sub(' ', text.strip()).casefold()}"
+
+
+class TranslationCache:
+    """
+    Память: ограниченный OrderedDict (LRU) с TTL на запись.
+    Диск: таблица SQLite, переживает рестарты и редеплой (путь — AK_CACHE_DB).
+    Пустые результаты («перевода нет») кэшируются с отдельным, более коротким TTL.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        maxsize: int = 2048,
+        ttl: float = 7 * 24 * 3600,
+        negative_ttl: float = 6 * 3600,
+    ):
+        self.path = path or None
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._mem: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_failed = False
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "mem_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "stale_hits": 0,
+            "evictions": 0,
+            "expired": 0,
+            "writes": 0,
+            "disk_errors": 0,
+        }
+
+    # ----- диск -----
+    def _conn(self) -> sqlite3.Connection | None:
+        if self._db is not None or self._db_failed or not self.path:
+            return self._db
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db = db
+        except Exception:
+            self._db_failed = True
+            self.stats["disk_errors"] += 1
+        return self._db
+
+    def _disk_get(self, key: str) -> tuple[float, dict] | None:
+        db = self._conn()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT value, expires FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception:
+            self.stats["disk_errors"] += 1
+            return None
+        if not row:
+            return None
+        return row[1], _json.loads(row[0])
+
+    def _disk_put(self, key: str, expires: float, value: dict) -> None:
+        db = self._conn()
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO translations (key, value, expires) VALUES (?, ?, ?)",
+                (key, _json.dumps(value, ensure_ascii=False), expires),
+            )
+        except Exception:
+            self.stats["disk_errors"] += 1
+
+    # ----- память -----
+    def _mem_put(self, key: str, expires: float, value: dict) -> None:
+        self._mem[key] = (expires, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # ----- API -----
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        item = self._mem.get(key)
+        if item is not None:
+            if item[0] > now:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["mem_hits"] += 1
+                if not item[1].get("translations"):
+                    self.stats["negative_hits"] += 1
+                return item[1]
+            # просроченную запись не удаляем: пригодится get_stale(), LRU её вытеснит
+            self.stats["expired"] += 1
+
+        item = self._disk_get(key)
+        if item is not None and item[0] > now:
+            self._mem_put(key, item[0], item[1])
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+            if not item[1].get("translations"):
+                self.stats["negative_hits"] += 1
+            return item[1]
+
+        self.stats["misses"] += 1
+        return None
+
+    def has_fresh(self, key: str) -> bool:
+        """Есть ли неистёкшая запись — без статистики и без сдвига в LRU (для прогрева)."""
+        now = time.time()
+        item = self._mem.get(key)
+        if item is not None and item[0] > now:
+            return True
+        item = self._disk_get(key)
+        return item is not None and item[0] > now
+
+    def get_stale(self, key: str) -> dict | None:
+        """Запись без учёта TTL — для ответа, когда бэкенд недоступен."""
+        item = self._mem.get(key) or self._disk_get(key)
+        if item is None:
+            return None
+        self.stats["stale_hits"] += 1
+        return item[1]
+
+    def put(self, key: str, value: dict) -> None:
+        ttl = self.ttl if value.get("translations") else self.negative_ttl
+        expires = time.time() + ttl
+        self._mem_put(key, expires, value)
+        self._disk_put(key, expires, value)
+        self.stats["writes"] += 1
+
+    def snapshot(self) -> dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / total, 4) if total else 0.0,
+            "mem_size": len(self._mem),
+            "mem_maxsize": self.maxsize,
+            "disk_path": self.path,
+            "disk_enabled": self._db is not None,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,186 @@
+# ak_dict.py — офлайн-словарь Akambash (akambash_dict.json) с нормализованными индексами
+from __future__ import annotations
+
+import json as _json
+import os
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from ak_translit import transliterate, transliterate_many
+
+LANGS = ("ru", "ab", "lat", "tr")
+
+DICT_PATH = os.getenv(
+    "AK_DICT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "akambash_dict.json"),
+)
+# собранный ak_dictbin.py артефакт (mmap, без разбора JSON); "" — всегда JSON
+DICT_BIN = os.getenv("AK_DICT_BIN", os.path.splitext(DICT_PATH)[0] + ".akd")
+
+# комбинируемые ударения (´ `), точка над i после casefold("İ"); ё → е
+_STRIP = {0x0300: None, 0x0301: None, 0x0307: None, ord("ё"): "е"}
+
+
+def normalize(text: str) -> str:
+    """«Догово́р» → «договор»: без ударений, casefold, ё = е, пробелы схлопнуты."""
+    text = text.strip()
+    if text.isascii():
+        return " ".join(text.lower().split())
+    text = text.casefold()
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    return " ".join(text.translate(_STRIP).split())
+
+
+class Dictionary:
+    """
+    Записи хранятся списком, для каждого языка — dict «нормализованный ключ → индексы
+    записей». Поиск — один normalize() и одно обращение к хэш-таблице.
+    """
+
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        # латиница для каждого абхазского слова: из поля lat, где его нет — по правилам
+        missing = [e for e in entries if e.get("ab") and not e.get("lat")]
+        for entry, lat in zip(missing, transliterate_many([e["ab"] for e in missing])):
+            entry["lat"] = lat
+        self.index: dict[str, dict[str, list[int]]] = {lang: {} for lang in LANGS}
+        self.max_words = 1  # самая длинная словарная фраза, в словах
+        for i, entry in enumerate(entries):
+            for lang in LANGS:
+                value = entry.get(lang)
+                if not value:
+                    continue
+                key = normalize(value)
+                self.index[lang].setdefault(key, []).append(i)
+                if " " in key:
+                    self.max_words = max(self.max_words, key.count(" ") + 1)
+        self.lat_by_ab = {normalize(e["ab"]): e["lat"] for e in entries if e.get("ab")}
+        self._prefix_keys: list[str] | None = None
+        self._prefix_refs: list[tuple[str, int]] = []
+        self._prefix_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, text: str, src: str) -> list[dict]:
+        idx = self.index.get(src)
+        if not idx:
+            return []
+        return [self.entries[i] for i in idx.get(normalize(text), ())]
+
+    def find(self, text: str, prefer: str | None = None) -> tuple[str, list[dict]]:
+        """Ищет сначала в языке prefer, затем во всех остальных индексах."""
+        key = normalize(text)
+        order = ((prefer,) if prefer in self.index else ()) + LANGS
+        for lang in order:
+            hits = self.index[lang].get(key)
+            if hits:
+                return lang, [self.entries[i] for i in hits]
+        return "", []
+
+    def transliterate(self, ab_text: str) -> str:
+        """Готовая латиница из словаря, для остальных слов — правила ak_translit."""
+        return self.lat_by_ab.get(normalize(ab_text)) or transliterate(ab_text)
+
+    def translate(self, text: str, src: str, dst: str) -> list[str]:
+        out, seen = [], set()
+        for entry in self.lookup(text, src):
+            value = entry.get(dst)
+            if value and value not in seen:
+                seen.add(value)
+                out.append(value)
+        return out
+
+    # ----- префиксный поиск (inline-подсказки) -----
+    def prefix_index(self) -> list[str]:
+        """Отсортированные ключи всех языков + параллельный массив (язык, запись); строится один раз."""
+        if self._prefix_keys is None:
+            with self._prefix_lock:
+                if self._prefix_keys is None:
+                    pairs = sorted(
+                        (key, lang, i)
+                        for lang in LANGS
+                        for key, ids in self.index[lang].items()
+                        for i in ids
+                    )
+                    self._prefix_refs = [(lang, i) for _, lang, i in pairs]
+                    self._prefix_keys = [key for key, _, _ in pairs]
+        return self._prefix_keys
+
+    def suggest(self, prefix: str, limit: int = 10, scan: int = 200) -> list[tuple[str, dict]]:
+        """
+        Записи, у которых слово на каком-либо языке начинается с prefix: (язык, запись).
+        Бинарный поиск по отсортированным ключам, просмотр не дальше scan ключей;
+        точное совпадение и короткие слова — выше.
+        """
+        p = normalize(prefix)
+        if not p:
+            return []
+        keys = self.prefix_index()
+        candidates = []
+        i = bisect_left(keys, p)
+        end = min(len(keys), i + scan)
+        while i < end and keys[i].startswith(p):
+            candidates.append((keys[i] != p, len(keys[i]), i))
+            i += 1
+        candidates.sort()
+        out, seen = [], set()
+        for _, _, k in candidates:
+            lang, idx = self._prefix_refs[k]
+            if idx in seen:
+                continue
+            seen.add(idx)
+            out.append((lang, self.entries[idx]))
+            if len(out) >= limit:
+                break
+        return out
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), **{f"{lang}_keys": len(self.index[lang]) for lang in LANGS}}
+
+
+def load_json(path: str = DICT_PATH) -> Dictionary:
+    try:
+        with open(path, "rb") as f:
+            entries = _json.loads(f.read())
+    except FileNotFoundError:
+        entries = []
+    return Dictionary([e for e in entries if isinstance(e, dict)])
+
+
+def _bin_is_fresh(bin_path: str, json_path: str) -> bool:
+    try:
+        built = os.path.getmtime(bin_path)
+    except OSError:
+        return False
+    try:
+        return built >= os.path.getmtime(json_path)
+    except OSError:
+        return True  # JSON не выкладывали — только артефакт
+
+
+def load_dictionary(path: str = DICT_PATH, bin_path: str = DICT_BIN) -> Dictionary:
+    """Собранный .akd, если он не старше JSON; иначе — разбор JSON."""
+    if bin_path and _bin_is_fresh(bin_path, path):
+        from ak_dictbin import CompiledDictionary
+        try:
+            return CompiledDictionary(bin_path)
+        except (OSError, ValueError):
+            pass  # битый или чужой артефакт — JSON надёжнее
+    return load_json(path)
+
+
+_DICT: Dictionary | None = None
+_DICT_LOCK = threading.Lock()
+
+
+def get_dictionary() -> Dictionary:
+    """Ленивая загрузка: первый вызов строит индексы, дальше — готовый объект."""
+    global _DICT
+    if _DICT is None:
+        with _DICT_LOCK:
+            if _DICT is None:
+                _DICT = load_dictionary()
+    return _DICT
@@ -0,0 +1,202 @@
+# ak_dictbin.py — бинарный словарь (.akd) с готовыми индексами: сборка из JSON и чтение через mmap
+#
+# Формат (uint32, порядок байт машины; заголовок проверяется при открытии):
+#   header   MAGIC, BOM, n_strings, n_entries, n_refs, max_words, keys[ru,ab,lat,tr]
+#   offsets  n_strings + 1 — границы строк в blob
+#   entries  n_entries × 4 — номер строки ru/ab/lat/tr (NONE — поля нет)
+#   refs     n_refs × 2    — (ключ, язык << 30 | запись), отсортировано по нормализованному ключу
+#   blob     UTF-8 всех строк подряд (одинаковые строки хранятся один раз)
+#
+# Открытие — mmap и разбор заголовка, без json и без построения dict'ов: поиск —
+# бинарный поиск по refs, строки декодируются только при обращении.
+#
+#   python ak_dictbin.py [akambash_dict.json] [akambash_dict.akd]   — сборка
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+from ak_dict import DICT_BIN, DICT_PATH, LANGS, Dictionary, load_json, normalize
+from ak_translit import transliterate
+
+MAGIC = 0x31444B41  # b"AKD1"
+BOM = 0x01020304
+NONE = 0xFFFFFFFF
+_HEADER = 6 + len(LANGS)
+_SHIFT = 30  # 2 бита на язык, до 2**30 записей
+_MASK = (1 << _SHIFT) - 1
+
+
+def build(json_path: str = DICT_PATH, out_path: str = DICT_BIN) -> Dictionary:
+    """JSON → .akd. Индексы и недостающий lat считает обычный Dictionary — семантика та же."""
+    d = load_json(json_path)
+    if len(d.entries) > _MASK:
+        raise ValueError(f"{json_path}: too many entries for .akd ({len(d.entries)})")
+    strings: dict[str, int] = {}
+
+    def sid(value: str) -> int:
+        n = strings.get(value)
+        if n is None:
+            n = strings[value] = len(strings)
+        return n
+
+    entries = array("I")
+    for entry in d.entries:
+        entries.extend(sid(entry[lang]) if entry.get(lang) else NONE for lang in LANGS)
+    refs = array("I")
+    # тот же порядок, что у Dictionary.prefix_index(): (ключ, язык, запись)
+    for key, lang, i in sorted((key, lang, i) for lang in LANGS
+                               for key, ids in d.index[lang].items() for i in ids):
+        refs.extend((sid(key), LANGS.index(lang) << _SHIFT | i))
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in strings:  # dict хранит порядок вставки = номер строки
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    blob += b"\0" * (-len(blob) % 4)
+
+    header = array("I", [MAGIC, BOM, len(strings), len(d.entries), len(refs) // 2, d.max_words])
+    header.extend(len(d.index[lang]) for lang in LANGS)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        for part in (header, offsets, entries, refs):
+            part.tofile(f)
+        f.write(blob)
+    os.replace(tmp, out_path)  # читатели не видят недописанный файл
+    return d
+
+
+class _Strings:
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, n: int) -> str:
+        return str(self.blob[self.offsets[n]:self.offsets[n + 1]], "utf-8")
+
+
+class _Entries:
+    """Последовательность записей: dict собирается при обращении."""
+
+    def __init__(self, table: memoryview, strings: _Strings):
+        self._table = table
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._table) // len(LANGS)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        row = self._table[i * len(LANGS):(i + 1) * len(LANGS)]
+        if len(row) < len(LANGS):
+            raise IndexError(i)
+        return {lang: self._strings[n] for lang, n in zip(LANGS, row) if n != NONE}
+
+
+class _Keys:
+    """Отсортированные ключи refs — для bisect (как Dictionary.prefix_index())."""
+
+    def __init__(self, refs: memoryview, strings: _Strings):
+        self._refs = refs
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._refs) // 2
+
+    def __getitem__(self, k: int) -> str:
+        return self._strings[self._refs[k * 2]]
+
+
+class _Refs:
+    def __init__(self, refs: memoryview):
+        self._refs = refs
+
+    def __len__(self) -> int:
+        return len(self._refs) // 2
+
+    def __getitem__(self, k: int) -> tuple[str, int]:
+        ref = self._refs[k * 2 + 1]
+        return LANGS[ref >> _SHIFT], ref & _MASK
+
+
+class _LangIndex:
+    """Read-only аналог Dictionary.index[lang]: ключ → номера записей."""
+
+    def __init__(self, lang: int, keys: _Keys, refs: memoryview, size: int):
+        self._lang = lang
+        self._keys = keys
+        self._refs = refs
+        self._size = size
+
+    def get(self, key: str, default=None):
+        keys, refs = self._keys, self._refs
+        k = bisect_left(keys, key)
+        out = []
+        while k < len(keys) and keys[k] == key:
+            ref = refs[k * 2 + 1]
+            if ref >> _SHIFT == self._lang:
+                out.append(ref & _MASK)
+            k += 1
+        return out or default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: str) -> list[int]:
+        hits = self.get(key)
+        if hits is None:
+            raise KeyError(key)
+        return hits
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class CompiledDictionary(Dictionary):
+    """Dictionary поверх mmap .akd-файла: тот же интерфейс, без загрузки в память."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        head = mv[:_HEADER * 4].cast("I")
+        if len(head) < _HEADER or head[0] != MAGIC or head[1] != BOM:
+            raise ValueError(f"{path}: not an .akd dictionary for this platform")
+        n_strings, n_entries, n_refs, self.max_words = head[2:6]
+        pos = _HEADER * 4
+
+        def section(count: int) -> memoryview:
+            nonlocal pos
+            part = mv[pos:pos + count * 4].cast("I")
+            pos += count * 4
+            return part
+
+        offsets = section(n_strings + 1)
+        table = section(n_entries * len(LANGS))
+        refs = section(n_refs * 2)
+        strings = _Strings(offsets, mv[pos:])
+        self.path = path
+        self.entries = _Entries(table, strings)
+        self._prefix_keys = _Keys(refs, strings)
+        self._prefix_refs = _Refs(refs)
+        self.index = {lang: _LangIndex(n, self._prefix_keys, refs, head[6 + n]) for n, lang in enumerate(LANGS)}
+
+    def transliterate(self, ab_text: str) -> str:
+        hits = self.index["ab"].get(normalize(ab_text))
+        return (self.entries[hits[0]].get("lat") if hits else None) or transliterate(ab_text)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else DICT_PATH
+    out = sys.argv[2] if len(sys.argv) > 2 else (DICT_BIN if src == DICT_PATH else os.path.splitext(src)[0] + ".akd")
+    d = build(src, out)
+    print(f"{out}: {len(d)} entries, {os.path.getsize(out)} bytes (json {os.path.getsize(src)} bytes)")
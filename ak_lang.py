@@ -0,0 +1,86 @@
+# ak_lang.py — быстрое определение языка ввода (ru / ab / tr / en)
+#
+# Сначала смотрим на алфавит и словарь — это детерминированно и работает на
+# одном-двух словах. langdetect (медленный, случайная выборка n-грамм, профиля
+# абхазского нет) вызывается только для неоднозначной латиницы.
+from __future__ import annotations
+
+import threading
+
+from ak_dict import get_dictionary, normalize
+
+# буквы, которых нет в русском алфавите, но есть в абхазском
+AB_LETTERS = frozenset("әҳҭқҟҵҷҩԥӷџҿҽҧӡҕҫӘҲҬҚҞҴҶҨԤӶЏҾҼҦӠҔҪ")
+# однозначно турецкие буквы и общие с другими латиницами (ç ö ü)
+TR_LETTERS = frozenset("ğşıİĞŞ")
+TR_WEAK_LETTERS = frozenset("çöüÇÖÜ")
+
+_LANGDETECT = None
+_LANGDETECT_LOCK = threading.Lock()  # detect_slow идёт в потоках пула (ak_offload)
+
+
+def _langdetect(text: str) -> str | None:
+    global _LANGDETECT
+    if _LANGDETECT is None:
+        with _LANGDETECT_LOCK:
+            if _LANGDETECT is None:
+                # импорт и загрузка профилей — только при первой неоднозначной латинице;
+                # профили langdetect грузит лениво и без блокировки, поэтому — здесь же
+                from langdetect import DetectorFactory, detect
+                from langdetect.detector_factory import init_factory
+                DetectorFactory.seed = 0
+                init_factory()
+                _LANGDETECT = detect
+    try:
+        return _LANGDETECT(text)
+    except Exception:
+        return None
+
+
+def _is_cyrillic(ch: str) -> bool:
+    return "Ѐ" <= ch <= "ԯ"
+
+
+def detect_fast(text: str) -> str | None:
+    """Язык по алфавиту и словарю; None — если решить не удалось (нужен langdetect)."""
+    cyr = lat = 0
+    weak_tr = False
+    for ch in text:
+        if ch in AB_LETTERS:
+            return "ab"
+        if ch in TR_LETTERS:
+            return "tr"
+        if _is_cyrillic(ch):
+            cyr += 1
+        elif ch.isalpha():
+            lat += 1
+            if ch in TR_WEAK_LETTERS:
+                weak_tr = True
+    if not cyr and not lat:
+        return None
+
+    d = get_dictionary()
+    key = normalize(text)
+    if cyr >= lat:
+        # кириллица без абхазских букв: русский, если слово не только абхазское
+        if key in d.index["ab"] and key not in d.index["ru"]:
+            return "ab"
+        return "ru"
+    if key in d.index["tr"] or weak_tr:
+        return "tr"
+    if key in d.index["lat"]:
+        return "ab"
+    return None
+
+
+def detect_lang(text: str) -> str:
+    return detect_fast(text) or detect_slow(text)
+
+
+def detect_slow(text: str) -> str:
+    """Fallback через langdetect — CPU-тяжёлый, вызывающий может увести его в пул (ak_offload)."""
+    if not any(ch.isalpha() for ch in text):
+        return "ru"
+    code = _langdetect(text)
+    # латиница не может быть русским: по умолчанию — английский
+    return {"en": "en", "tr": "tr"}.get(code or "", "en")
@@ -0,0 +1,104 @@
+# ak_metrics.py — дешёвые метрики для горячего пути + экспорт в формате Prometheus
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable
+
+# секунды: от 0.5 мс (словарь/кэш) до 10 с (медленный Glosbe)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels: dict[str, str] | None) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Counter:
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name: str, labels: str):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{self.labels} {self.value}"]
+
+
+class Histogram:
+    """Границы и счётчики выделены заранее: observe() — bisect и три сложения."""
+
+    __slots__ = ("name", "labels", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name: str, labels: str, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # последний — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> list[str]:
+        inner = self.labels[1:-1] + "," if self.labels else ""
+        out, acc = [], 0
+        for bound, n in zip(self.bounds, self.counts):
+            acc += n
+            out.append(f'{self.name}_bucket{{{inner}le="{bound:g}"}} {acc}')
+        out.append(f'{self.name}_bucket{{{inner}le="+Inf"}} {self.count}')
+        out.append(f"{self.name}_sum{self.labels} {self.sum:.6f}")
+        out.append(f"{self.name}_count{self.labels} {self.count}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._families: dict[str, tuple[str, str, list]] = {}  # name → (type, help, metrics)
+        self._snapshots: dict[str, tuple[str, Callable[[], dict]]] = {}
+
+    def _add(self, kind: str, name: str, help_: str, metric):
+        family = self._families.setdefault(name, (kind, help_, []))
+        family[2].append(metric)
+        return metric
+
+    def counter(self, name: str, help_: str, labels: dict[str, str] | None = None) -> Counter:
+        return self._add("counter", name, help_, Counter(name, _labels(labels)))
+
+    def histogram(self, name: str, help_: str, labels: dict[str, str] | None = None,
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add("histogram", name, help_, Histogram(name, _labels(labels), buckets))
+
+    def snapshot(self, prefix: str, help_: str, fn: Callable[[], dict]) -> None:
+        """Числовые поля fn() (например, GL_CACHE.snapshot) экспортируются как gauge prefix_<поле>."""
+        self._snapshots[prefix] = (help_, fn)
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_, metrics) in self._families.items():
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+            for m in metrics:
+                lines.extend(m.render())
+        for prefix, (help_, fn) in self._snapshots.items():
+            try:
+                data = fn()
+            except Exception:
+                continue
+            for key, value in data.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# HELP {prefix}_{key} {help_}")
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,132 @@
+# ak_offload.py — CPU-работа (разбор страниц, langdetect) вне event loop + монитор задержки цикла
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import BrokenExecutor, Executor, ThreadPoolExecutor
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+MODES = ("thread", "process", "inline")
+
+
+class CpuOffload:
+    """
+    Синхронные CPU-функции уходят в пул: thread (по умолчанию) или process
+    (несколько ядер; функции и аргументы должны пересылаться pickle).
+    Входы меньше inline_below выполняются прямо в цикле — пересылка дороже
+    самой работы. В пуле одновременно не больше max_queue задач, остальные
+    ждут (обратное давление, а не бесконечная очередь executor'а).
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 2, max_queue: int = 64, inline_below: int = 32768):
+        if mode not in MODES:
+            raise ValueError(f"unknown executor mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.inline_below = inline_below
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._queued = 0
+        self.stats = {"inline": 0, "offloaded": 0, "waited": 0, "failed": 0, "broken": 0}
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                from concurrent.futures import ProcessPoolExecutor  # multiprocessing — только если нужен
+                self._executor = ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ak-cpu")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, size: int | None = None) -> Any:
+        """fn(*args) в пуле; size — размер входа (для порога inline), None — всегда в пул."""
+        if self.mode == "inline" or (size is not None and size < self.inline_below):
+            self.stats["inline"] += 1
+            return fn(*args)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+        if self._slots.locked():
+            self.stats["waited"] += 1
+        async with self._slots:
+            self._queued += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+            except BrokenExecutor:
+                # воркер упал (OOM/kill) — пересоздаём пул, эту задачу делаем сами
+                self.stats["broken"] += 1
+                self._executor = None
+                return fn(*args)
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            finally:
+                self._queued -= 1
+        self.stats["offloaded"] += 1
+        return result
+
+    async def close(self, *_: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "mode": self.mode,
+            "workers": self.workers,
+            "in_flight": self._queued,
+            "max_queue": self.max_queue,
+            "inline_below": self.inline_below,
+        }
+
+
+class LoopLagMonitor:
+    """
+    Раз в interval секунд засыпает и меряет, насколько позже проснулся:
+    это время цикл был занят синхронным кодом. Задержки больше warn_after
+    пишутся в лог (не чаще раза в секунду) и считаются как stalls.
+    """
+
+    def __init__(self, interval: float = 0.25, warn_after: float = 0.1, histogram=None):
+        self.interval = interval
+        self.warn_after = warn_after
+        self.histogram = histogram
+        self._task: asyncio.Task | None = None
+        self._last_warn = 0.0
+        self.stats = {"samples": 0, "stalls": 0, "last_lag": 0.0, "max_lag": 0.0}
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.stats["samples"] += 1
+            self.stats["last_lag"] = round(lag, 6)
+            if lag > self.stats["max_lag"]:
+                self.stats["max_lag"] = round(lag, 6)
+            if self.histogram is not None:
+                self.histogram.observe(lag)
+            if lag > self.warn_after:
+                self.stats["stalls"] += 1
+                now = time.monotonic()
+                if now - self._last_warn > 1.0:
+                    self._last_warn = now
+                    log.warning("event loop blocked for %.0f ms", lag * 1000)
+
+    async def start(self, *_: Any) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, *_: Any) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "interval": self.interval, "warn_after": self.warn_after}
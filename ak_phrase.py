@@ -0,0 +1,46 @@
+# ak_phrase.py — разбор фразы на слова и пакетный поиск по офлайн-словарю
+from __future__ import annotations
+
+import re
+
+from ak_dict import Dictionary, normalize
+
+# слово: буквы/цифры, внутри — комбинируемые ударения, апостроф, дефис
+TOKEN_RE = re.compile(r"\w[\w\u0300\u0301\u0307'’-]*")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text)
+
+
+def resolve(d: Dictionary, tokens: list[str], langs: tuple[str, ...], dst: str) -> list[dict]:
+    """
+    Жадно, слева направо: на каждой позиции пробуем самое длинное словарное
+    выражение (до d.max_words слов), затем короче, вплоть до одного слова.
+    Сегмент: {"text", "value", "lat"}; value=None — в словаре нет, нужен Glosbe.
+    """
+    keys = [normalize(t) for t in tokens]
+    segments: list[dict] = []
+    i = 0
+    while i < len(tokens):
+        found = None
+        for n in range(min(d.max_words, len(tokens) - i), 0, -1):
+            key = " ".join(keys[i:i + n])
+            for lang in langs:
+                hits = d.index[lang].get(key)
+                if hits:
+                    entry = next((d.entries[h] for h in hits if d.entries[h].get(dst)), None)
+                    if entry is not None:
+                        found = (n, entry)
+                        break
+            if found:
+                break
+        if found:
+            n, entry = found
+            segments.append({"text": " ".join(tokens[i:i + n]), "value": entry[dst],
+                             "lat": entry.get("lat") if dst == "ab" else None})
+            i += n
+        else:
+            segments.append({"text": tokens[i], "value": None, "lat": None})
+            i += 1
+    return segments
@@ -0,0 +1,141 @@
+# ak_querylog.py — журнал запросов на перевод (JSONL): пакетная запись в фоне + топ частых запросов
+from __future__ import annotations
+
+import asyncio
+import json as _json
+import logging
+import os
+import time
+from collections import Counter, deque
+from typing import Any
+
+from ak_cache import make_key
+
+log = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """
+    record() только кладёт запись в ограниченный буфер (при переполнении —
+    отбрасывает и считает dropped), хэндлер никогда не ждёт диска. Фоновая
+    задача раз в flush_interval пишет накопленное одним append в потоке;
+    файл больше max_bytes переименовывается в .1 (.1 → .2 …, хранится backups).
+    """
+
+    def __init__(self, path: str | None, max_buffer: int = 10000, flush_interval: float = 2.0,
+                 max_bytes: int = 10 * 2**20, backups: int = 3):
+        self.path = path or None
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._buffer: deque[dict] = deque()
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None  # одна запись/ротация за раз
+        self.stats = {"recorded": 0, "dropped": 0, "written": 0, "flushes": 0, "rotations": 0, "errors": 0}
+
+    def record(self, query: str, src: str, dst: str, source: str) -> None:
+        if self.path is None:
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self.stats["dropped"] += 1
+            return
+        self._buffer.append({"ts": round(time.time(), 3), "q": query, "src": src, "dst": dst, "source": source})
+        self.stats["recorded"] += 1
+
+    # ----- сериализация и запись (в потоке executor'а) -----
+    def _rotate(self) -> None:
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.stats["rotations"] += 1
+
+    def _write(self, batch: list[dict]) -> None:
+        lines = "".join(_json.dumps(r, ensure_ascii=False) + "\n" for r in batch)
+        try:
+            if os.path.getsize(self.path) + len(lines) > self.max_bytes:
+                self._rotate()
+        except FileNotFoundError:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def flush(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._buffer:
+            return
+        batch = list(self._buffer)
+        self._buffer.clear()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+        except OSError:
+            self.stats["errors"] += 1
+            log.exception("query log write failed, %d records lost", len(batch))
+            return
+        self.stats["written"] += len(batch)
+        self.stats["flushes"] += 1
+
+    async def _run(self) -> None:
+        # не cancel(): запись в потоке не прерывается, поэтому останавливаемся между пакетами
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def start(self, *_: Any) -> None:
+        if self.path is not None and self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, *_: Any) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "buffered": len(self._buffer), "path": self.path}
+
+
+def top_queries(path: str, n: int, max_lines: int = 500_000) -> list[tuple[str, str, str, int]]:
+    """
+    Самые частые запросы из журнала и его последней ротации: (текст, src, dst, сколько раз).
+    Одинаковые с точностью до регистра/пробелов считаются вместе. Строки не из
+    журнала (чужой JSON, мусор) пропускаются.
+    """
+    counts: Counter[str] = Counter()
+    sample: dict[str, tuple[str, str, str]] = {}
+    seen = 0
+    for name in (path, f"{path}.1"):
+        try:
+            f = open(name, encoding="utf-8")
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                seen += 1
+                if seen > max_lines:
+                    break
+                try:
+                    r = _json.loads(line)
+                    query, src, dst = r["q"], r["src"], r["dst"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if not isinstance(query, str) or not query.strip():
+                    continue
+                key = make_key(query, src, dst)
+                counts[key] += 1
+                sample.setdefault(key, (query.strip(), src, dst))
+    return [(*sample[key], count) for key, count in counts.most_common(n)]
@@ -0,0 +1,158 @@
+# ak_sched.py — планировщик сетевых переводов: общий лимит, честные очереди по чатам
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TranslationOverloaded(Exception):
+    """Очередь переполнена — пользователю нужно сказать «попробуй позже»."""
+
+
+class TranslationSuperseded(Exception):
+    """Из того же чата пришло более новое сообщение, пока это ждало очереди."""
+
+
+class _Job:
+    __slots__ = ("chat", "factory", "future")
+
+    def __init__(self, chat: Hashable, factory: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.chat = chat
+        self.factory = factory
+        self.future = future
+
+
+class _Group:
+    """Ключ очереди групповых задач чата — отдельный от самого chat."""
+    __slots__ = ("chat",)
+
+    def __init__(self, chat: Hashable):
+        self.chat = chat
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Group) and other.chat == self.chat
+
+    def __hash__(self) -> int:
+        return hash((_Group, self.chat))
+
+
+class TranslationScheduler:
+    """
+    Не больше max_concurrent сетевых переводов одновременно. Ожидающие задачи
+    лежат в очередях по чатам и запускаются по кругу (round-robin), чтобы один
+    болтливый чат не занимал все слоты. Новое сообщение вытесняет ещё не
+    начатые задачи своего чата; у чата не больше per_chat задач в работе —
+    следующая ждёт в очереди, пока одна из них не закончится.
+    Всего ожидающих — не больше max_pending, дальше TranslationOverloaded.
+    supersede=False — задача из группы (слова одной фразы): стоит в отдельной
+    очереди чата, не вытесняет и не вытесняется; таких у чата в работе не
+    больше per_group, сколько их ждёт одновременно, ограничивает вызывающий.
+    """
+
+    def __init__(self, max_concurrent: int = 8, per_chat: int = 2, max_pending: int = 500,
+                 per_group: int = 5):
+        self.max_concurrent = max_concurrent
+        self.per_chat = per_chat
+        self.per_group = per_group
+        self.max_pending = max_pending
+        self._queues: dict[Hashable, deque[_Job]] = {}
+        self._ready: deque[Hashable] = deque()
+        self._running: dict[Hashable, int] = {}
+        self._active = 0
+        self._pending = 0
+        self._tasks: set[asyncio.Future] = set()
+        self.stats = {"submitted": 0, "started": 0, "completed": 0, "superseded": 0, "overloaded": 0}
+
+    async def run(self, chat: Hashable, factory: Callable[[], Awaitable[Any]], supersede: bool = True) -> Any:
+        if self._pending >= self.max_pending:
+            self.stats["overloaded"] += 1
+            raise TranslationOverloaded()
+        self.stats["submitted"] += 1
+        if not supersede:
+            chat = _Group(chat)
+
+        queue = self._queues.get(chat)
+        if queue is None:
+            # чат в _ready ровно тогда, когда у него есть очередь и он не упёрся в свой лимит;
+            # упёршийся вернётся в _ready, когда закончится одна из его задач (_execute)
+            queue = self._queues[chat] = deque()
+            if self._running.get(chat, 0) < self._limit(chat):
+                self._ready.append(chat)
+        while supersede and queue:
+            old = queue.popleft()
+            self._pending -= 1
+            self.stats["superseded"] += 1
+            if not old.future.done():
+                old.future.set_exception(TranslationSuperseded())
+
+        job = _Job(chat, factory, asyncio.get_running_loop().create_future())
+        queue.append(job)
+        self._pending += 1
+        self._pump()
+        return await job.future
+
+    def _limit(self, chat: Hashable) -> int:
+        return self.per_group if isinstance(chat, _Group) else self.per_chat
+
+    def _pump(self) -> None:
+        while self._active < self.max_concurrent and self._ready:
+            chat = self._ready.popleft()
+            queue = self._queues.get(chat)
+            if not queue:
+                self._queues.pop(chat, None)
+                continue
+            job = queue.popleft()
+            self._pending -= 1
+            if job.future.done():  # ожидающий отменён, пока стоял в очереди
+                if queue:
+                    self._ready.append(chat)
+                else:
+                    del self._queues[chat]
+                continue
+            running = self._running[chat] = self._running.get(chat, 0) + 1
+            if not queue:
+                del self._queues[chat]
+            elif running < self._limit(chat):
+                self._ready.append(chat)
+            self._active += 1
+            self.stats["started"] += 1
+            task = asyncio.ensure_future(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            result = await job.factory()
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._active -= 1
+            left = self._running[job.chat] - 1
+            if left:
+                self._running[job.chat] = left
+            else:
+                del self._running[job.chat]
+            if left == self._limit(job.chat) - 1 and job.chat in self._queues:
+                self._ready.append(job.chat)  # чат ждал свободного места у себя
+            self.stats["completed"] += 1
+            self._pump()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "active": self._active,
+            "pending": self._pending,
+            "chats_waiting": len(self._queues),
+            "max_concurrent": self.max_concurrent,
+            "per_chat": self.per_chat,
+            "per_group": self.per_group,
+            "max_pending": self.max_pending,
+        }
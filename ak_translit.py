@@ -0,0 +1,65 @@
+# ak_translit.py — транслитерация абхазской кириллицы в латиницу (как поле lat в akambash_dict.json)
+#
+# Правила компилируются один раз при импорте:
+#   однобуквенные  → таблица str.translate (один проход на C);
+#   многобуквенные → одна регулярка-альтернация, длинные правила первыми
+#                    (longest match), применяется до таблицы.
+# Выход многобуквенных правил — латиница, таблица её уже не трогает.
+from __future__ import annotations
+
+import re
+
+RULES = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "io", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "'", "э": "e", "ю": "iu",
+    "я": "ia",
+    # абхазские буквы
+    "ә": "ə", "қ": "q", "ҟ": "q'", "ҳ": "h", "ҭ": "t'", "ԥ": "p'", "ҧ": "p'", "ҵ": "ts'",
+    "ҷ": "ch'", "ҽ": "ch", "ҿ": "ch'", "ҩ": "w", "ӷ": "gh", "џ": "dzh", "ӡ": "dz",
+    # диграфы, которые не складываются из отдельных букв
+    "хь": "h'",
+}
+
+# ударения и прочие комбинируемые знаки в латинице не нужны
+_DROP = ("\u0300", "\u0301")
+
+
+def _compile(rules: dict[str, str]):
+    full: dict[str, str] = {}
+    for src, dst in rules.items():
+        full[src] = dst
+        upper = src[0].upper() + src[1:]
+        full.setdefault(upper, dst[:1].upper() + dst[1:])
+    single = {ord(k): v for k, v in full.items() if len(k) == 1}
+    single.update({ord(c): None for c in _DROP})
+    multi = {k: v for k, v in full.items() if len(k) > 1}
+    pattern = None
+    if multi:
+        # между буквами диграфа может стоять ударение: «хь» и «х́ь» — одно и то же
+        marks = "[" + "".join(_DROP) + "]?"
+        alts = sorted(multi, key=len, reverse=True)
+        pattern = re.compile("|".join(marks.join(map(re.escape, k)) for k in alts))
+    return str.maketrans(single), multi, pattern
+
+
+_TABLE, _MULTI, _MULTI_RE = _compile(RULES)
+_MULTI_KEY = {ord(c): None for c in _DROP}
+
+
+def _multi(m: re.Match) -> str:
+    return _MULTI[m.group().translate(_MULTI_KEY)]
+
+
+def transliterate(text: str) -> str:
+    if _MULTI_RE is not None:
+        text = _MULTI_RE.sub(_multi, text)
+    return text.translate(_TABLE)
+
+
+def transliterate_many(texts: list[str]) -> list[str]:
+    """Пакетно: склеиваем через \\n, один проход регулярки и таблицы, режем обратно."""
+    if not texts:
+        return []
+    return transliterate("\n".join(t.replace("\n", " ") for t in texts)).split("\n")
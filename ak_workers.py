@@ -0,0 +1,136 @@
+# ak_workers.py — быстрый ответ Telegram на /webhook + ограниченный пул обработчиков апдейтов
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+
+class UpdateWorkerPool:
+    """
+    Апдейты кладутся в ограниченную очередь и обрабатываются workers задачами.
+    Повторная доставка того же update_id (Telegram ретраит при таймауте)
+    отбрасывается. stop() дожидается обработки уже принятых апдейтов.
+    """
+
+    def __init__(self, process: Callable[[dict], Awaitable[Any]] | None = None,
+                 workers: int = 16, maxsize: int = 1000, dedupe_window: int = 10000):
+        self.process = process
+        self.workers = workers
+        self.queue: asyncio.Queue[dict] | None = None
+        self.maxsize = maxsize
+        self._seen: set[int] = set()
+        self._seen_order: deque[int] = deque()
+        self._dedupe_window = dedupe_window
+        self._tasks: list[asyncio.Task] = []
+        self._busy = 0
+        self._busy_time = 0.0
+        self._started_at = 0.0
+        self.stats = {"accepted": 0, "duplicates": 0, "rejected": 0, "processed": 0, "failed": 0}
+
+    def _remember(self, update_id: int) -> bool:
+        if update_id in self._seen:
+            return False
+        self._seen.add(update_id)
+        self._seen_order.append(update_id)
+        if len(self._seen_order) > self._dedupe_window:
+            self._seen.discard(self._seen_order.popleft())
+        return True
+
+    def submit(self, update: dict) -> bool:
+        """False — очередь полна (апдейт не принят); дубликаты считаются принятыми."""
+        if self.queue is None:
+            raise RuntimeError("UpdateWorkerPool is not started")
+        update_id = update.get("update_id")
+        if isinstance(update_id, int) and update_id in self._seen:
+            self.stats["duplicates"] += 1
+            return True
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return False
+        if isinstance(update_id, int):
+            self._remember(update_id)
+        self.stats["accepted"] += 1
+        return True
+
+    async def _worker(self) -> None:
+        assert self.queue is not None
+        while True:
+            update = await self.queue.get()
+            self._busy += 1
+            started = time.perf_counter()
+            try:
+                await self.process(update)
+                self.stats["processed"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+                log.exception("update %s failed", update.get("update_id"))
+            finally:
+                self._busy -= 1
+                self._busy_time += time.perf_counter() - started
+                self.queue.task_done()
+
+    async def start(self, *_: Any) -> None:
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue(self.maxsize)
+        self._started_at = time.perf_counter()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 20.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("webhook queue not drained: %d updates dropped", self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            **self.stats,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_maxsize": self.maxsize,
+            "workers": self.workers,
+            "busy": self._busy,
+            "utilization": round(self._busy_time / (uptime * self.workers), 4) if uptime else 0.0,
+        }
+
+
+class QueuedRequestHandler(SimpleRequestHandler):
+    """SimpleRequestHandler, который сразу отвечает 200 и отдаёт апдейт в UpdateWorkerPool."""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, pool: UpdateWorkerPool, **kwargs: Any):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self.pool = pool
+        pool.process = lambda update: self._background_feed_update(bot=self.bot, update=update)
+
+    def register(self, app: web.Application, /, path: str, **kwargs: Any) -> None:
+        app.on_startup.append(self.pool.start)
+        super().register(app, path=path, **kwargs)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        if not self.pool.submit(update):
+            # очередь полна — Telegram повторит доставку позже
+            return web.Response(status=503, text="busy")
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def close(self) -> None:
+        # сначала дообработать принятые апдейты, потом закрыть сессию бота
+        await self.pool.stop()
+        await super().close()
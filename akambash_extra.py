@@ -2,13 +2,15 @@
 from __future__ import annotations
 
 # ===== aiogram / UI =====
-import asyncio, html, re, json as _json
-from collections import deque
+import asyncio, html, itertools, os, re, time, json as _json
+from collections import OrderedDict, deque
 from aiogram import Router, F
 from aiogram.filters import Command, CommandObject
 from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import (
-    Message, CallbackQuery,
+    Message, CallbackQuery, InlineQuery,
+    InlineQueryResultArticle, InputTextMessageContent,
     ReplyKeyboardMarkup, KeyboardButton,
     InlineKeyboardMarkup, InlineKeyboardButton,
 )
@@ -44,10 +46,35 @@ async def more_word(cb: CallbackQuery):
 
 # ===== Glosbe переводчик (усиленный) =====
 import aiohttp
-from langdetect import detect, DetectorFactory
-DetectorFactory.seed = 0
+from ak_breaker import CircuitBreaker
+from ak_cache import TranslationCache, make_key
+from ak_dict import get_dictionary, normalize
+from ak_lang import detect_fast, detect_slow
+from ak_metrics import REGISTRY
+from ak_offload import CpuOffload, LoopLagMonitor
+from ak_phrase import resolve as resolve_phrase, tokenize
+from ak_querylog import QueryLog, top_queries
+from ak_sched import TranslationOverloaded, TranslationScheduler, TranslationSuperseded
 
-AK_GLOSBE_LOG = deque(maxlen=20)  # мини-лог попыток
+# ===== Метрики (экспорт — /metrics в bot.py) =====
+# Объекты создаются один раз; на горячем пути — только observe()/inc().
+_STAGE_HELP = "Latency of translate_to_abkhaz stages, seconds"
+M_DETECT = REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "detect"})
+M_PARSE_NEXT = REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "parse_next_data"})
+M_PARSE_HTML = REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "parse_html"})
+M_SEND = REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "telegram_send"})
+M_TRANSLATE = REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "translate_total"})
+M_LOOP_LAG = REGISTRY.histogram("ak_event_loop_lag_seconds", "How late the event loop wakes up from a sleep, seconds")
+_OUTCOME_HELP = "Translation outcomes"
+M_HIT = REGISTRY.counter("ak_translate_outcome_total", _OUTCOME_HELP, {"outcome": "hit"})
+M_MISS = REGISTRY.counter("ak_translate_outcome_total", _OUTCOME_HELP, {"outcome": "miss"})
+M_NO_PRIMARY = REGISTRY.counter("ak_translate_outcome_total", _OUTCOME_HELP, {"outcome": "no_primary"})
+M_FETCH_FAIL = REGISTRY.counter("ak_translate_outcome_total", _OUTCOME_HELP, {"outcome": "fetch_fail"})
+_EVENT_HELP = "Glosbe client events"
+M_BREAKER_OPEN = REGISTRY.counter("ak_glosbe_events_total", _EVENT_HELP, {"event": "breaker_rejected"})
+M_NEXT_DATA_ERROR = REGISTRY.counter("ak_glosbe_events_total", _EVENT_HELP, {"event": "next_data_parse_error"})
+M_FALLBACK_HTML = REGISTRY.counter("ak_glosbe_events_total", _EVENT_HELP, {"event": "fallback_html"})
+M_STALE = REGISTRY.counter("ak_glosbe_events_total", _EVENT_HELP, {"event": "served_stale"})
 
 GL_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
@@ -57,37 +84,180 @@ GL_HEADERS = {
     "Connection": "keep-alive",
 }
 
-def _aklog(**kwargs):
-    AK_GLOSBE_LOG.append(kwargs)
+GL_BASE_URL = os.getenv("GLOSBE_BASE_URL", "https://glosbe.com").rstrip("/")
 
-def detect_lang(text: str) -> str:
+# Общий HTTP-клиент: создаётся один раз в app_factory (bot.py) и переиспользуется
+# всеми переводами — пул соединений, keep-alive и DNS-кэш вместо нового
+# TCP/TLS-рукопожатия на каждое сообщение.
+GL_POOL_LIMIT = int(os.getenv("GLOSBE_POOL_LIMIT", "32"))
+GL_POOL_LIMIT_PER_HOST = int(os.getenv("GLOSBE_POOL_LIMIT_PER_HOST", "16"))
+GL_KEEPALIVE = float(os.getenv("GLOSBE_KEEPALIVE", "30"))
+GL_DNS_TTL = int(os.getenv("GLOSBE_DNS_TTL", "300"))
+
+_GL_SESSION: aiohttp.ClientSession | None = None
+
+# Кэш переводов: LRU в памяти + SQLite (AK_CACHE_DB="" — только память)
+GL_CACHE = TranslationCache(
+    os.getenv("AK_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "translations.sqlite3")),
+    maxsize=int(os.getenv("AK_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("AK_CACHE_TTL", str(7 * 24 * 3600))),
+    negative_ttl=float(os.getenv("AK_CACHE_NEGATIVE_TTL", str(6 * 3600))),
+)
+
+# CPU-работа (разбор страниц Glosbe, langdetect) — вне event loop, чтобы тяжёлая
+# страница одного чата не останавливала остальные. AK_CPU_EXECUTOR: thread | process | inline.
+GL_CPU = CpuOffload(
+    mode=os.getenv("AK_CPU_EXECUTOR", "thread"),
+    workers=int(os.getenv("AK_CPU_WORKERS", "2")),
+    max_queue=int(os.getenv("AK_CPU_QUEUE", "64")),
+    inline_below=int(os.getenv("AK_CPU_INLINE_BYTES", "32768")),
+)
+# Журнал запросов (JSONL, AK_QUERY_LOG="" — не писать): что спрашивают + источник для прогрева кэша
+QUERY_LOG = QueryLog(
+    os.getenv("AK_QUERY_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "requests.jsonl")),
+    max_buffer=int(os.getenv("AK_QUERY_LOG_BUFFER", "10000")),
+    flush_interval=float(os.getenv("AK_QUERY_LOG_FLUSH", "2")),
+    max_bytes=int(os.getenv("AK_QUERY_LOG_MAX_BYTES", str(10 * 2**20))),
+    backups=int(os.getenv("AK_QUERY_LOG_BACKUPS", "3")),
+)
+LOOP_LAG = LoopLagMonitor(warn_after=float(os.getenv("AK_LOOP_LAG_WARN", "0.1")), histogram=M_LOOP_LAG)
+
+def make_glosbe_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=GL_POOL_LIMIT,
+        limit_per_host=GL_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=GL_KEEPALIVE,
+        ttl_dns_cache=GL_DNS_TTL,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(connector=connector, headers=GL_HEADERS)
+
+def set_glosbe_session(session: aiohttp.ClientSession | None) -> None:
+    global _GL_SESSION
+    _GL_SESSION = session
+
+async def glosbe_session_ctx(app):
+    """aiohttp cleanup_ctx: общий клиент живёт столько же, сколько приложение."""
+    session = make_glosbe_session()
+    set_glosbe_session(session)
     try:
-        code = detect(text)
-    except Exception:
-        return "ru"
-    return {"ru":"ru","en":"en","tr":"tr","ab":"ab"}.get(code, "ru")
+        yield
+    finally:
+        set_glosbe_session(None)
+        await session.close()
+
+async def preload_dictionary(app):
+    # индексы (включая префиксный для inline) строятся в фоновом потоке — /health отвечает сразу
+    asyncio.get_running_loop().run_in_executor(None, lambda: get_dictionary().prefix_index())
 
-# Заглушка SCII — подставь свою реализацию при готовности
+async def close_cache(app):
+    GL_CACHE.close()
+
+async def close_cpu(app):
+    await GL_CPU.close()
+
+async def detect_lang_timed(text: str) -> str:
+    started = time.perf_counter()
+    # алфавит и словарь — сразу; langdetect для неоднозначной латиницы — в пуле
+    code = detect_fast(text) or await GL_CPU.run(detect_slow, text)
+    M_DETECT.observe(time.perf_counter() - started)
+    return code
+
+# SCII: абхазская кириллица → латиница (правила — ak_translit, готовые значения — словарь)
 def scii_translit(ab_text: str) -> str:
-    return ab_text
+    return get_dictionary().transliterate(ab_text)
+
+# Политика загрузки: общий бюджет времени на запрос, а не 4 × 12 с с паузами.
+# 404 — «такого слова нет», не повторяем; 429 — ждём Retry-After, если бюджет позволяет;
+# 5xx/сеть — короткий экспоненциальный backoff. Circuit breaker отсекает запросы,
+# пока Glosbe лежит, и пробует его половинчатыми (half-open) запросами.
+GL_DEADLINE = float(os.getenv("GLOSBE_DEADLINE", "8"))
+GL_ATTEMPT_TIMEOUT = float(os.getenv("GLOSBE_ATTEMPT_TIMEOUT", "5"))
+GL_MAX_ATTEMPTS = int(os.getenv("GLOSBE_MAX_ATTEMPTS", "3"))
+GL_BREAKER = CircuitBreaker(
+    failure_threshold=int(os.getenv("GLOSBE_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("GLOSBE_BREAKER_RESET", "30")),
+)
+GL_SCHEDULER = TranslationScheduler(
+    max_concurrent=int(os.getenv("GLOSBE_CONCURRENCY", "16")),  # = GLOSBE_POOL_LIMIT_PER_HOST
+    per_chat=int(os.getenv("GLOSBE_PER_CHAT", "2")),
+    # слова одной фразы — своей очередью чата: 10 слов за одну задержку Glosbe
+    per_group=int(os.getenv("GLOSBE_PHRASE_CONCURRENCY", "10")),
+    # ждать очереди может не больше апдейтов, чем воркеров webhook (bot.py); лимит — половина,
+    # чтобы остальные воркеры разбирали очередь апдейтов и отвечали «попробуй позже», а не стояли
+    max_pending=int(os.getenv("GLOSBE_MAX_PENDING", str(int(os.getenv("WEBHOOK_WORKERS", "64")) // 2))),
+)
+GL_ATTEMPTS = deque(maxlen=50)  # последние попытки: статус и время, для диагностики
+M_FETCH = [REGISTRY.histogram("ak_stage_seconds", _STAGE_HELP, {"stage": "fetch", "attempt": str(i + 1)})
+           for i in range(GL_MAX_ATTEMPTS)]
 
-async def _gl_fetch(session: aiohttp.ClientSession, url: str) -> str:
+def _gl_retry_after(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None  # HTTP-date в Retry-After Glosbe не присылает
+
+async def _gl_fetch(session: aiohttp.ClientSession, url: str, deadline: float | None = None) -> str | None:
+    """HTML страницы; "" — Glosbe ответил «нет такого слова» (404); None — сбой/нет ответа."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (GL_DEADLINE if deadline is None else deadline)
+    if not GL_BREAKER.allow():
+        M_BREAKER_OPEN.inc()
+        return None
     last_err = None
-    for attempt in range(4):
-        try:
-            async with session.get(
-                url, headers=GL_HEADERS, allow_redirects=True,
-                timeout=aiohttp.ClientTimeout(total=12)
-            ) as r:
-                text = await r.text()
-                if r.status == 200 and text:
-                    return text
-                last_err = f"HTTP {r.status}"
-        except Exception as e:
-            last_err = f"{type(e).__name__}: {e}"
-        await asyncio.sleep(0.7 * (attempt + 1))
-    _aklog(stage="fetch_fail", url=url, error=last_err)
-    return ""
+    verdict = False
+    try:
+        for attempt in range(GL_MAX_ATTEMPTS):
+            remaining = deadline - loop.time()
+            if remaining <= 0.05:
+                last_err = last_err or "deadline"
+                break
+            started = loop.time()
+            status = 0
+            wait = 0.3 * (2 ** attempt)
+            try:
+                async with session.get(
+                    url, headers=GL_HEADERS, allow_redirects=True,
+                    timeout=aiohttp.ClientTimeout(total=min(GL_ATTEMPT_TIMEOUT, remaining))
+                ) as r:
+                    status = r.status
+                    if status == 200:
+                        text = await r.text()
+                        if text:
+                            GL_BREAKER.record_success(); verdict = True
+                            return text
+                        last_err = "empty body"
+                    elif status == 404:
+                        GL_BREAKER.record_success(); verdict = True
+                        return ""
+                    elif status == 429:
+                        last_err = "HTTP 429"
+                        wait = _gl_retry_after(r.headers.get("Retry-After")) or wait
+                    elif status < 500:
+                        last_err = f"HTTP {status}"
+                        break  # прочие 4xx повтором не лечатся
+                    else:
+                        last_err = f"HTTP {status}"
+            except asyncio.TimeoutError:
+                last_err = "timeout"
+            except Exception as e:
+                # ClientError, битая кодировка тела и прочее — неудачная попытка, не падение
+                # хэндлера; CancelledError (BaseException) проходит насквозь
+                last_err = f"{type(e).__name__}: {e}"
+            finally:
+                took = loop.time() - started
+                M_FETCH[attempt].observe(took)
+                GL_ATTEMPTS.append({"attempt": attempt + 1, "status": status,
+                                    "ms": round(took * 1000, 1), "error": last_err})
+            if attempt == GL_MAX_ATTEMPTS - 1 or loop.time() + wait >= deadline:
+                break  # после последней попытки ждать нечего
+            await asyncio.sleep(wait)
+        GL_BREAKER.record_failure(); verdict = True
+    finally:
+        if not verdict:
+            GL_BREAKER.release()
+    M_FETCH_FAIL.inc()
+    return None
 
 def _gl_extract_next_data(html_text: str) -> dict:
     m = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.+?)</script>',
@@ -96,8 +266,8 @@ def _gl_extract_next_data(html_text: str) -> dict:
         return {}
     try:
         return _json.loads(html.unescape(m.group(1)))
-    except Exception as e:
-        _aklog(stage="next_data_parse_error", error=str(e))
+    except Exception:
+        M_NEXT_DATA_ERROR.inc()
         return {}
 
 def _gl_pull_translations_from_next(next_data: dict) -> list[str]:
@@ -125,12 +295,98 @@ def _gl_pull_translations_from_next(next_data: dict) -> list[str]:
             seen.add(w); uniq.append(w)
     return uniq
 
-def _gl_pull_translations_from_html(html_text: str) -> list[str]:
-    # лёгкий HTML-fallback, если структура Glosbe изменится
-    candidates = re.findall(
-        r'(?:class="[^"]*translation[^"]*"[^>]*>|data-testid="translation"[^>]*>)([^<]{1,80})</',
-        html_text, flags=re.IGNORECASE
-    )
+# Точечный разбор __NEXT_DATA__: ищем блок по смещению, в нём — только ключи
+# с массивами переводов, и декодируем каждый массив прямо из страницы
+# (raw_decode с позиции — без копии блока, unescape и обхода всего дерева).
+# Порядок — как у _gl_pull_translations_from_next: объекты в порядке обхода
+# (по позиции открывающей «{»), у объекта сначала его собственные ключи
+# displayTranslations → translation → translations, потом вложенные.
+# Владельца ключа находит один проход по блоку: _GL_TOKEN_RE пропускает строки
+# и объекты глубины ≤ 2 без ключей (примеры употребления) целиком и
+# останавливается только на прочих «{», «}» и ключах. Квантификаторы
+# possessive (*+): без них re копит точки отката на всю длину блока (мегабайты).
+GL_MAX_VARIANTS = 10
+_GL_NEXT_OPEN = '"__NEXT_DATA__"'  # перед ним — id= в любом регистре
+_GL_TR_KEY_RANK = {"displayTranslations": 0, "translation": 1, "translations": 2}
+_GL_KEY = r'"(displayTranslations|translations?)"\s*:\s*\['
+_GL_STR = r'"(?!(?:displayTranslations|translations?)"\s*:\s*\[)[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_GL_LEAF = rf'\{{[^{{}}"]*+(?:{_GL_STR}[^{{}}"]*+)*+\}}'
+_GL_OBJ2 = rf'\{{[^{{}}"]*+(?:(?:{_GL_STR}|{_GL_LEAF})[^{{}}"]*+)*+\}}'
+_GL_KEY_RE = re.compile(_GL_KEY)
+_GL_TOKEN_RE = re.compile(rf'[^{{}}"]*+(?:(?:{_GL_STR}|{_GL_OBJ2})[^{{}}"]*+)*+(?:(\{{)|(\}})|{_GL_KEY})')
+_GL_JSON = _json.JSONDecoder()
+
+def _gl_next_data_span(html_text: str) -> tuple[int, int] | None:
+    pos = html_text.find(_GL_NEXT_OPEN)
+    if pos < 0 or html_text[pos - 3:pos].lower() != "id=":
+        return None
+    start = html_text.find(">", pos)
+    end = html_text.find("</script>", start)
+    if start < 0 or end < 0:
+        return None
+    return start + 1, end
+
+def _gl_translation_arrays(html_text: str, start: int, end: int) -> list[int] | None:
+    """Позиции «[» массивов переводов в порядке обхода дерева; None — блок не разобрать."""
+    if not _GL_KEY_RE.search(html_text, start, end):
+        return []  # ключей нет (слово не найдено) — структура не нужна
+    found: list[tuple[int, int, int]] = []
+    opened: list[int] = []  # позиции «{» незакрытых объектов
+    for m in _GL_TOKEN_RE.finditer(html_text, start, end):
+        if m.group(1):
+            opened.append(m.start(1))
+        elif m.group(2):
+            if not opened:
+                return None
+            opened.pop()
+        else:
+            found.append((opened[-1] if opened else -1, _GL_TR_KEY_RANK[m.group(3)], m.end() - 1))
+    found.sort()
+    return [pos for _, _, pos in found]
+
+def _gl_extract_translations_fast(html_text: str, span: tuple[int, int],
+                                  limit: int = GL_MAX_VARIANTS) -> list[str] | None:
+    """Переводы из блока __NEXT_DATA__ (span); None — блок экранирован, нужен полный разбор."""
+    start, end = span
+    if html_text.find("&quot;", start, end) >= 0:
+        return None
+    arrays = _gl_translation_arrays(html_text, start, end)
+    if arrays is None:
+        return None
+    uniq: list[str] = []
+    seen: set[str] = set()
+    for pos in arrays:
+        try:
+            items, _ = _GL_JSON.raw_decode(html_text, pos)
+        except ValueError:
+            return None
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            val = item.get("displayText") or item.get("text") or item.get("phrase")
+            if not isinstance(val, str):
+                continue
+            v = val.strip()
+            if "&" in v:
+                v = html.unescape(v)
+            if v and v not in seen:
+                seen.add(v); uniq.append(v)
+                if len(uniq) >= limit:
+                    return uniq
+    return uniq
+
+_GL_HTML_TR_RE = re.compile(
+    r'(?:class="[^"]*translation[^"]*"[^>]*>|data-testid="translation"[^>]*>)([^<]{1,80})</',
+    flags=re.IGNORECASE,
+)
+
+def _gl_pull_translations_from_html(html_text: str, skip: tuple[int, int] | None = None) -> list[str]:
+    # лёгкий HTML-fallback, если структура Glosbe изменится;
+    # skip — диапазон __NEXT_DATA__, в JSON разметки нет, сканировать его незачем
+    if skip:
+        candidates = _GL_HTML_TR_RE.findall(html_text, 0, skip[0]) + _GL_HTML_TR_RE.findall(html_text, skip[1])
+    else:
+        candidates = _GL_HTML_TR_RE.findall(html_text)
     cleaned, seen = [], set()
     for c in candidates:
         v = html.unescape(c).strip()
@@ -138,44 +394,356 @@ def _gl_pull_translations_from_html(html_text: str) -> list[str]:
             seen.add(v); cleaned.append(v)
     return cleaned
 
-async def glosbe_translate(term: str, src: str, dst: str = "ab") -> dict:
+def _gl_parse_page_timed(html_text: str) -> tuple[list[str], float, float | None]:
+    """Для пула (в том числе процессного): переводы и время этапов; гистограммы пишет вызывающий."""
+    started = time.perf_counter()
+    span = _gl_next_data_span(html_text)
+    translations = _gl_extract_translations_fast(html_text, span) if span else []
+    if translations is None:
+        # блок экранирован/нестандартный — полный разбор, как раньше
+        next_data = _gl_extract_next_data(html_text)
+        translations = _gl_pull_translations_from_next(next_data)[:GL_MAX_VARIANTS] if next_data else []
+    parsed = time.perf_counter()
+    html_s = None
+    if not translations:
+        translations = _gl_pull_translations_from_html(html_text, span)[:GL_MAX_VARIANTS]
+        html_s = time.perf_counter() - parsed
+    return translations, parsed - started, html_s
+
+def _gl_record_parse(timed: tuple[list[str], float, float | None]) -> list[str]:
+    translations, next_s, html_s = timed
+    M_PARSE_NEXT.observe(next_s)
+    if html_s is not None:
+        M_PARSE_HTML.observe(html_s)
+        if translations:
+            M_FALLBACK_HTML.inc()
+    return translations
+
+def _gl_parse_page(html_text: str) -> list[str]:
+    return _gl_record_parse(_gl_parse_page_timed(html_text))
+
+async def _gl_parse_page_offloaded(html_text: str) -> list[str]:
+    # маленькие страницы разбираются на месте, большие — в GL_CPU
+    return _gl_record_parse(await GL_CPU.run(_gl_parse_page_timed, html_text, size=len(html_text)))
+
+async def glosbe_translate(term: str, src: str, dst: str = "ab", chat=None, supersede: bool = True) -> dict:
     src = {"ru":"ru","en":"en","tr":"tr","ab":"ab"}.get(src, "ru")
     dst = {"ru":"ru","en":"en","tr":"tr","ab":"ab"}.get(dst, "ab")
-    url = f"https://glosbe.com/{src}/{dst}/{term}"
-    _aklog(stage="start", url=url, term=term, src=src, dst=dst)
-    async with aiohttp.ClientSession() as session:
-        html_text = await _gl_fetch(session, url)
-    if not html_text:
-        return {"src": src, "dst": dst, "term": term, "translations": [], "primary": ""}
+    key = make_key(term, src, dst)
+    cached = GL_CACHE.get(key)
+    if cached is not None:
+        M_HIT.inc()
+        return {**cached, "term": term}
+    M_MISS.inc()
+    # Новая загрузка из чата идёт через GL_SCHEDULER (общий лимит + очередь чата);
+    # присоединение к уже идущей загрузке и вызовы без chat — без очереди.
+    if chat is None or key in _GL_INFLIGHT:
+        res = await _gl_join(key, term, src, dst)
+    else:
+        res = await _gl_schedule(key, term, src, dst, chat, supersede)
+    return {**res, "term": term}
 
-    next_data = _gl_extract_next_data(html_text)
-    translations = _gl_pull_translations_from_next(next_data) if next_data else []
-    if not translations:
-        translations = _gl_pull_translations_from_html(html_text)
-        if translations:
-            _aklog(stage="fallback_html", count=len(translations))
+_GL_QUEUED: dict[str, asyncio.Future] = {}  # слово ждёт слота в GL_SCHEDULER
+
+async def _gl_schedule(key: str, term: str, src: str, dst: str, chat, supersede: bool) -> dict:
+    queued = _GL_QUEUED.get(key)
+    if queued is not None:
+        # то же слово уже стоит в очереди (от другого сообщения) — ждём его, не занимая
+        # место в max_pending; если его вытеснили в своём чате — встаём в очередь сами
+        try:
+            return await asyncio.shield(queued)
+        except TranslationSuperseded:
+            cached = GL_CACHE.get(key)
+            if cached is not None:
+                return cached
+    run = asyncio.ensure_future(GL_SCHEDULER.run(chat, lambda: _gl_join_scheduled(key, term, src, dst), supersede))
+    _GL_QUEUED.setdefault(key, run)
+    run.add_done_callback(lambda f, k=key: _gl_unqueue(k, f))
+    # shield — уход автора не снимает задачу, которую ждут другие
+    return await asyncio.shield(run)
+
+def _gl_unqueue(key: str, run: asyncio.Future) -> None:
+    if _GL_QUEUED.get(key) is run:
+        del _GL_QUEUED[key]
+    if not run.cancelled():
+        run.exception()  # ушедшим автором не прочитана — иначе «exception was never retrieved»
+
+async def _gl_join_scheduled(key: str, term: str, src: str, dst: str) -> dict:
+    # пока задача стояла в очереди, слово могли загрузить (или начать грузить) для другого чата
+    cached = GL_CACHE.get(key)
+    if cached is not None:
+        return cached
+    return await _gl_join(key, term, src, dst)
+
+def _gl_join(key: str, term: str, src: str, dst: str):
+    # single-flight: одинаковые одновременные запросы ждут одну общую загрузку.
+    # shield — отмена одного ожидающего (пользователь ушёл) не отменяет общую задачу.
+    task = _GL_INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_gl_lookup_shared(key, term, src, dst))
+        _GL_INFLIGHT[key] = task
+        task.add_done_callback(lambda _t, k=key: _GL_INFLIGHT.pop(k, None))
+    return asyncio.shield(task)
+
+_GL_INFLIGHT: dict[str, asyncio.Task] = {}
 
+async def _gl_lookup_shared(key: str, term: str, src: str, dst: str) -> dict:
+    res, fetched = await _gl_lookup(term, src, dst)
+    if fetched:
+        # сбой сети не кэшируем; «перевода нет» — кэшируем с коротким TTL
+        GL_CACHE.put(key, res)
+        return res
+    # Glosbe недоступен (или breaker открыт) — лучше устаревший ответ, чем никакого
+    stale = GL_CACHE.get_stale(key)
+    if stale is not None:
+        M_STALE.inc()
+        return {**stale, "stale": True}
+    return res
+
+async def _gl_lookup(term: str, src: str, dst: str) -> tuple[dict, bool]:
+    url = f"{GL_BASE_URL}/{src}/{dst}/{term}"
+    session = _GL_SESSION
+    if session is not None and not session.closed:
+        html_text = await _gl_fetch(session, url)
+    else:
+        # вне приложения (скрипты, отладка) — разовая сессия, как раньше
+        async with aiohttp.ClientSession() as session:
+            html_text = await _gl_fetch(session, url)
+    if html_text is None:
+        return {"src": src, "dst": dst, "term": term, "translations": [], "primary": ""}, False
+
+    translations = await _gl_parse_page_offloaded(html_text) if html_text else []
     primary = translations[0] if translations else ""
-    return {"src": src, "dst": dst, "term": term, "translations": translations, "primary": primary}
+    return {"src": src, "dst": dst, "term": term, "translations": translations, "primary": primary}, True
 
-async def translate_to_abkhaz(text: str) -> dict:
-    src = detect_lang(text)
-    res = await glosbe_translate(text, src=src, dst="ab")
+def _dict_to_abkhaz(text: str, src: str) -> dict | None:
+    # lat — абхазский латиницей, тоже даёт ответ; "ab" здесь не ищем
+    d = get_dictionary()
+    for lang in dict.fromkeys((src, "ru", "tr", "lat")):
+        entries = d.lookup(text, lang)
+        if entries:
+            break
+    else:
+        return None
+    variants = list(dict.fromkeys(e["ab"] for e in entries if e.get("ab")))
+    if not variants:
+        return None
+    first = next(e for e in entries if e.get("ab"))
+    return {"src": lang if lang != "lat" else "ab", "query": text, "ab": variants[0],
+            "lat": first.get("lat") or scii_translit(variants[0]), "variants": variants[:5], "source": "dict"}
+
+async def translate_to_abkhaz(text: str, src: str | None = None, chat=None) -> dict:
+    started = time.perf_counter()
+    src = src or await detect_lang_timed(text)
+    local = _dict_to_abkhaz(text, src)
+    if local:
+        M_HIT.inc()
+        M_TRANSLATE.observe(time.perf_counter() - started)
+        QUERY_LOG.record(text, src, "ab", "dict")
+        return local
+    QUERY_LOG.record(text, src, "ab", "glosbe")
+    res = await glosbe_translate(text, src=src, dst="ab", chat=chat)
     ab = res.get("primary") or ""
     lat = scii_translit(ab) if ab else ""
-    out = {"src": src, "query": text, "ab": ab, "lat": lat, "variants": res.get("translations", [])[:5]}
+    out = {"src": src, "query": text, "ab": ab, "lat": lat, "variants": res.get("translations", [])[:5], "source": "glosbe"}
     if not ab:
-        _aklog(stage="no_primary", query=text, variants=out["variants"])
+        M_NO_PRIMARY.inc()
+    M_TRANSLATE.observe(time.perf_counter() - started)
     return out
 
+async def translate_from_abkhaz(text: str, dst: str = "ru", chat=None) -> dict:
+    """Обратное направление ab → ru/tr/en: словарь, при промахе — Glosbe."""
+    d = get_dictionary()
+    variants = d.translate(text, "ab", dst) or d.translate(text, "lat", dst)
+    if variants:
+        M_HIT.inc()
+        QUERY_LOG.record(text, "ab", dst, "dict")
+        return {"src": "ab", "dst": dst, "query": text, "primary": variants[0], "variants": variants[:5], "source": "dict"}
+    QUERY_LOG.record(text, "ab", dst, "glosbe")
+    res = await glosbe_translate(text, src="ab", dst=dst, chat=chat)
+    return {"src": "ab", "dst": res["dst"], "query": text, "primary": res.get("primary") or "",
+            "variants": res.get("translations", [])[:5], "source": "glosbe"}
+
+# ===== Фразы: словарь пакетом, промахи — параллельно в Glosbe =====
+GL_PHRASE_CONCURRENCY = GL_SCHEDULER.per_group
+GL_PHRASE_MAX_WORDS = int(os.getenv("GLOSBE_PHRASE_MAX_WORDS", "30"))
+PHRASE_EDIT_INTERVAL = 0.8  # Telegram не любит частые правки одного сообщения
+
+async def translate_phrase(text: str, src: str | None = None, chat=None, on_update=None) -> dict:
+    """
+    Перевод по словам: всё, что есть в словаре (включая многословные выражения),
+    решается сразу; промахи идут в Glosbe параллельно, не больше
+    GL_PHRASE_CONCURRENCY одновременно (групповая очередь чата в планировщике,
+    отдельная от per_chat). on_update(segments) вызывается с
+    частичным результатом сразу и после каждого найденного слова.
+    """
+    src = src or await detect_lang_timed(text)
+    dst = "ru" if src == "ab" else "ab"
+    langs = ("ab", "lat") if src == "ab" else tuple(dict.fromkeys((src, "ru", "tr", "lat")))
+    segments = resolve_phrase(get_dictionary(), tokenize(text)[:GL_PHRASE_MAX_WORDS], langs, dst)
+    misses = [seg for seg in segments if seg["value"] is None]
+    M_HIT.inc(len(segments) - len(misses))
+    QUERY_LOG.record(text, src, dst, "phrase")
+    if on_update:
+        await on_update(segments, final=False)
+
+    sem = asyncio.Semaphore(GL_PHRASE_CONCURRENCY)
+
+    async def fetch(seg: dict):
+        async with sem:
+            try:
+                # групповая очередь чата (общий лимит и честность между чатами), без вытеснения:
+                # слова этой и соседних фраз не отменяют друг друга
+                res = await glosbe_translate(seg["text"], src=src, dst=dst, chat=chat, supersede=False)
+            except (TranslationOverloaded, TranslationSuperseded):
+                res = {}
+        seg["value"] = res.get("primary") or ""
+        seg["lat"] = scii_translit(seg["value"]) if dst == "ab" and seg["value"] else None
+        if on_update:
+            await on_update(segments, final=False)
+
+    if misses:
+        await asyncio.gather(*(fetch(seg) for seg in misses))
+    if on_update:
+        await on_update(segments, final=True)
+    return {"src": src, "dst": dst, "query": text, "segments": segments}
+
+def _esc(text: str) -> str:
+    return html.escape(text, quote=False)
+
+def render_phrase(segments: list[dict], dst: str) -> str:
+    words = [seg["value"] or (f"[{seg['text']}]" if seg["value"] == "" else "…") for seg in segments]
+    lines = [f"<b>{dst.upper()}:</b> {_esc(' '.join(words))}"]
+    if dst == "ab":
+        lats = [seg["lat"] or "…" for seg in segments if seg["value"]]
+        if lats:
+            lines.append(f"<b>LAT:</b> {_esc(' '.join(lats))}")
+    lines.append("")
+    for seg, word in zip(segments, words):
+        lines.append(f"• {_esc(seg['text'])} — {_esc(word)}")
+    return "\n".join(lines)
+
+async def _reply_phrase(message: Message, text: str, src: str):
+    """Отвечает сразу словарной частью и дописывает ответ правками по мере загрузки слов."""
+    loop = asyncio.get_running_loop()
+    state = {"sent": None, "body": "", "at": 0.0}
+
+    async def on_update(segments: list[dict], final: bool):
+        pending = any(seg["value"] is None for seg in segments)
+        if not final and state["sent"] is not None and loop.time() - state["at"] < PHRASE_EDIT_INTERVAL:
+            return
+        if not final and state["sent"] is None and not pending:
+            return  # всё уже известно — хватит одного итогового сообщения
+        body = render_phrase(segments, "ru" if src == "ab" else "ab")
+        if body == state["body"]:
+            return
+        state["body"], state["at"] = body, loop.time()
+        if state["sent"] is None:
+            state["sent"] = await message.answer(body, parse_mode=ParseMode.HTML)
+        else:
+            try:
+                await state["sent"].edit_text(body, parse_mode=ParseMode.HTML)
+            except TelegramBadRequest:
+                pass  # "message is not modified" и т.п.
+
+    await translate_phrase(text, src, chat=message.chat.id, on_update=on_update)
+
+def _is_phrase(text: str) -> bool:
+    # несколько слов, и целиком это не словарное выражение
+    return len(tokenize(text)) > 1 and not get_dictionary().find(text)[1]
+
+# ===== Прогрев кэша частыми запросами из журнала =====
+# После редеплоя первые пользователи получают готовые ответы, а не холодный Glosbe.
+# Фоновая задача с низким приоритетом: своя очередь в GL_SCHEDULER, не больше
+# PREWARM_RATE загрузок в секунду, ждёт, пока в очереди есть запросы пользователей.
+PREWARM_TOP = int(os.getenv("AK_PREWARM_TOP", "200"))  # 0 — выключить
+PREWARM_RATE = float(os.getenv("AK_PREWARM_RATE", "1"))  # 0 — без ограничения
+PREWARM_DELAY = float(os.getenv("AK_PREWARM_DELAY", "10"))  # не мешать старту
+PREWARM_CHAT = "prewarm"
+PREWARM_STATS = {"candidates": 0, "skipped": 0, "fetched": 0, "failed": 0, "done": 0}
+
+def _prewarm_needed(term: str, src: str, dst: str) -> bool:
+    # ответ уже есть локально или свежий в кэше — загружать нечего
+    if dst == "ab" and _dict_to_abkhaz(term, src):
+        return False
+    if src == "ab":
+        d = get_dictionary()
+        if d.translate(term, "ab", dst) or d.translate(term, "lat", dst):
+            return False
+    return not GL_CACHE.has_fresh(make_key(term, src, dst))
+
+async def prewarm_popular(top: int = PREWARM_TOP) -> None:
+    loop = asyncio.get_running_loop()
+    queries = await loop.run_in_executor(None, top_queries, QUERY_LOG.path, top)
+    words = {}
+    for term, src, dst, _ in queries:
+        # фраза переводится по словам — греем слова, как их запросит translate_phrase
+        for word in (tokenize(term) if _is_phrase(term) else [term]):
+            words.setdefault(make_key(word, src, dst), (word, src, dst))
+    for word, src, dst in list(words.values())[:top]:
+        PREWARM_STATS["candidates"] += 1
+        if not _prewarm_needed(word, src, dst):
+            PREWARM_STATS["skipped"] += 1
+            continue
+        # уступаем: пользователи в очереди или Glosbe недоступен — ждём
+        while GL_SCHEDULER.snapshot()["pending"] or GL_BREAKER.snapshot()["state"] != "closed":
+            await asyncio.sleep(1.0)
+        try:
+            res = await glosbe_translate(word, src=src, dst=dst, chat=PREWARM_CHAT)
+        except (TranslationOverloaded, TranslationSuperseded):
+            res = {}
+        PREWARM_STATS["fetched" if res.get("translations") else "failed"] += 1
+        if PREWARM_RATE > 0:
+            await asyncio.sleep(1 / PREWARM_RATE)
+    PREWARM_STATS["done"] = 1
+
+async def query_log_ctx(app):
+    """aiohttp cleanup_ctx: фоновая запись журнала + однократный прогрев после старта."""
+    await QUERY_LOG.start()
+    task = None
+    if PREWARM_TOP > 0 and QUERY_LOG.path:
+        async def delayed():
+            await asyncio.sleep(PREWARM_DELAY)
+            await prewarm_popular()
+        task = asyncio.create_task(delayed())
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await QUERY_LOG.stop()
+
 # ===== Хэндлеры перевода =====
+BUSY_TEXT = "⏳ Сейчас очень много запросов — попробуй через минуту."
+
 @router.message(Command("tr"))
 async def tr_cmd(message: Message, command: CommandObject):
     text = (command.args or "").strip()
     if not text:
         await message.answer("Пришли слово или фразу после команды: `/tr море`", parse_mode=ParseMode.MARKDOWN)
         return
-    data = await translate_to_abkhaz(text)
+    src = await detect_lang_timed(text)
+    if _is_phrase(text):
+        await _reply_phrase(message, text, src)
+        return
+    try:
+        if src == "ab":
+            data = await translate_from_abkhaz(text, dst="ru", chat=message.chat.id)
+        else:
+            data = await translate_to_abkhaz(text, src, chat=message.chat.id)
+    except TranslationSuperseded:
+        return  # пользователь уже прислал новое сообщение
+    except TranslationOverloaded:
+        await message.answer(BUSY_TEXT)
+        return
+    if src == "ab":
+        if not data.get("primary"):
+            await message.answer("Не нашёл перевод на Glosbe. Попробуй другое слово.")
+            return
+        variants = ", ".join(data.get("variants", []))
+        await message.answer(f"<b>RU:</b> {data['primary']}\n\nВарианты: {variants}", parse_mode=ParseMode.HTML)
+        return
     if not data.get("ab"):
         await message.answer("Не нашёл перевод на Glosbe. Попробуй другое слово.")
         return
@@ -188,6 +756,96 @@ async def tr_cmd(message: Message, command: CommandObject):
 @router.message(F.text.len() > 0)
 async def tr_auto(message: Message):
     text = message.text.strip()
-    data = await translate_to_abkhaz(text)
+    src = await detect_lang_timed(text)
+    if _is_phrase(text):
+        await _reply_phrase(message, text, src)
+        return
+    try:
+        if src == "ab":
+            data = await translate_from_abkhaz(text, dst="ru", chat=message.chat.id)
+            if data.get("primary"):
+                await message.answer(f"{text} — {data['primary']}")
+            return
+        data = await translate_to_abkhaz(text, src, chat=message.chat.id)
+    except TranslationSuperseded:
+        return
+    except TranslationOverloaded:
+        await message.answer(BUSY_TEXT)
+        return
     if data.get("ab"):
         await message.answer(f"{data['ab']} — {data['lat']}")
+
+# ===== Inline-режим: подсказки по мере набора (@akambash_bot мор…) =====
+INLINE_LIMIT = 10
+INLINE_CACHE_SIZE = 4096
+INLINE_DEBOUNCE = float(os.getenv("INLINE_DEBOUNCE", "0.7"))  # пауза в наборе перед походом в Glosbe
+_INLINE_CACHE: OrderedDict[str, list[InlineQueryResultArticle]] = OrderedDict()
+_INLINE_LATEST: dict[int, int] = {}
+_INLINE_SEQ = itertools.count(1)
+
+def _inline_article(n: int, title: str, lat: str, extra: str = "") -> InlineQueryResultArticle:
+    return InlineQueryResultArticle(
+        id=str(n),
+        title=title,
+        description=" · ".join(x for x in (lat, extra) if x),
+        input_message_content=InputTextMessageContent(message_text=f"{title} ({lat})" if lat else title),
+    )
+
+def inline_articles(text: str) -> list[InlineQueryResultArticle]:
+    """Подсказки из словаря по префиксу; результат кэшируется по нормализованному префиксу."""
+    key = normalize(text)
+    cached = _INLINE_CACHE.get(key)
+    if cached is not None:
+        _INLINE_CACHE.move_to_end(key)
+        return cached
+    articles = []
+    for n, (lang, e) in enumerate(get_dictionary().suggest(key, INLINE_LIMIT)):
+        if lang in ("ab", "lat"):
+            title = f"{e.get('ab', '')} → {e.get('ru', '')}"
+        else:
+            title = f"{e.get(lang, '')} → {e.get('ab', '')}"
+        articles.append(_inline_article(n, title, e.get("lat", ""), e.get("tr", "") if lang != "tr" else e.get("ru", "")))
+    _INLINE_CACHE[key] = articles
+    if len(_INLINE_CACHE) > INLINE_CACHE_SIZE:
+        _INLINE_CACHE.popitem(last=False)
+    return articles
+
+@router.inline_query()
+async def inline_suggest(query: InlineQuery):
+    text = query.query.strip()
+    user = query.from_user.id
+    # номер запроса — до словаря: любой новый запрос (даже попавший в словарь)
+    # отменяет ожидающий поход в сеть от предыдущего
+    seq = next(_INLINE_SEQ)
+    _INLINE_LATEST[user] = seq
+    if not text:
+        del _INLINE_LATEST[user]
+        await query.answer([], cache_time=300)
+        return
+    articles = inline_articles(text)
+    if articles:
+        del _INLINE_LATEST[user]
+        await query.answer(articles, cache_time=300)
+        return
+    # В словаре нет. Сеть — только когда пользователь перестал печатать:
+    # ждём INLINE_DEBOUNCE и сдаёмся, если от него уже пришёл более новый запрос.
+    src = await detect_lang_timed(text)
+    if src == "ab":
+        # абхазский текст в Glosbe не ищем — пустой ответ, чтобы клиент не ждал
+        if _INLINE_LATEST.get(user) == seq:
+            del _INLINE_LATEST[user]
+        await query.answer([], cache_time=60)
+        return
+    await asyncio.sleep(INLINE_DEBOUNCE)
+    if _INLINE_LATEST.get(user) != seq:
+        return
+    del _INLINE_LATEST[user]
+    try:
+        res = await glosbe_translate(text, src=src, dst="ab", chat=("inline", user))
+    except (TranslationOverloaded, TranslationSuperseded):
+        return
+    ab = res.get("primary") or ""
+    if not ab:
+        await query.answer([], cache_time=60)
+        return
+    await query.answer([_inline_article(0, f"{text} → {ab}", scii_translit(ab))], cache_time=300)
@@ -0,0 +1,77 @@
+# bench/bench_coalesce.py — single-flight для glosbe_translate
+#
+# 100 одновременных одинаковых запросов к локальному fake Glosbe должны дать
+# ровно один HTTP-запрос; отменённый ожидающий не должен отменять общую загрузку.
+# То же из 100 разных чатов: запросы сверх лимита GL_SCHEDULER ждут в очереди
+# и, дождавшись, берут ответ из кэша, а не грузят слово заново.
+#
+#   python bench/bench_coalesce.py
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("AK_CACHE_DB", "")
+
+from aiohttp import web
+
+PAGE = (
+    '<html><head><script id="__NEXT_DATA__" type="application/json">'
+    '{"props":{"pageProps":{"translations":[{"displayText":"амшын"}]}}}'
+    "</script></head><body></body></html>"
+)
+
+
+async def main(n: int = 100):
+    hits = []
+
+    async def page(request):
+        hits.append(request.path)
+        await asyncio.sleep(0.2)  # медленный Glosbe — все запросы успевают «встретиться»
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{src}/{dst}/{term}", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    import akambash_extra as extra
+    extra.GL_BASE_URL = f"http://127.0.0.1:{port}"
+    session = extra.make_glosbe_session()
+    extra.set_glosbe_session(session)
+    try:
+        t0 = time.perf_counter()
+        tasks = [asyncio.create_task(extra.glosbe_translate("море", src="ru")) for _ in range(n)]
+        await asyncio.sleep(0.05)
+        tasks[0].cancel()  # первый (инициатор) уходит — остальные всё равно получают ответ
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        hits_before = len(hits)
+        t0 = time.perf_counter()
+        chats = await asyncio.gather(*(extra.glosbe_translate("небо", src="ru", chat=i) for i in range(n)),
+                                     return_exceptions=True)
+        chats_elapsed = (time.perf_counter() - t0) * 1000
+        chats_hits = len(hits) - hits_before
+    finally:
+        extra.set_glosbe_session(None)
+        await session.close()
+        await runner.cleanup()
+
+    ok = [r for r in results if isinstance(r, dict) and r.get("primary") == "амшын"]
+    print(f"requests: {n}  upstream hits: {hits_before}  answered: {len(ok)}  total: {elapsed:.1f} ms")
+    chats_ok = [r for r in chats if isinstance(r, dict) and r.get("primary") == "амшын"]
+    print(f"from {n} chats: upstream hits: {chats_hits}  answered: {len(chats_ok)}  total: {chats_elapsed:.1f} ms")
+    assert hits_before == 1, hits
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert len(ok) == n - 1
+    assert chats_hits == 1, hits[hits_before:]
+    assert len(chats_ok) == n
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,218 @@
+# bench/bench_e2e.py — сквозной нагрузочный прогон bot.py без Telegram и glosbe.com
+#
+# bot.py запускается отдельным процессом с локальными заменителями (fakes.py):
+# TELEGRAM_API_URL → FakeBotAPI, GLOSBE_BASE_URL → FakeGlosbe. Реплеер шлёт
+# апдейты в /webhook с заданной частотой (open loop) — синтетические или
+# записанные (JSONL, по апдейту на строку) — и ждёт ответов в FakeBotAPI.
+#
+# Отчёт: апдейтов/с, p50/p95/p99 от POST до первого ответа в чат, ответы
+# /webhook, исходящие запросы к Glosbe и Bot API, RSS процесса бота.
+# Задержка привязывается к чату (FIFO), поэтому у синтетических апдейтов
+# у каждого свой чат.
+#
+#   python bench/bench_e2e.py [--updates 2000] [--rate 200] [--glosbe-latency 0.05]
+#                             [--glosbe-errors 0.0] [--page small] [--replay FILE]
+#                             [--save FILE] [--json OUT] [--max-p95 MS]
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict, deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from bench_startup import free_port
+from fakes import FakeBotAPI, FakeGlosbe, text_update
+
+
+def proc_status(pid: int) -> dict[str, float]:
+    """VmRSS / VmHWM процесса, MB."""
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key = line.split(":", 1)[0]
+            if key in ("VmRSS", "VmHWM"):
+                out[key] = int(line.split()[1]) / 1024
+    return out
+
+
+def synthetic(n: int, seed: int = 16) -> list[dict]:
+    """Смесь как у учеников: словарные слова, повторяющиеся незнакомые (Zipf), фразы, /tr."""
+    rnd = random.Random(seed)
+    with open(os.path.join(ROOT, "akambash_dict.json"), encoding="utf-8") as f:
+        known = [e["ru"] for e in json.load(f) if e.get("ru")]
+    unknown = [f"слово{k}" for k in range(300)]
+    weights = [1 / (k + 1) for k in range(len(unknown))]
+    updates = []
+    for i in range(1, n + 1):
+        r = rnd.random()
+        if r < 0.5:
+            text = rnd.choice(known)
+        elif r < 0.8:
+            text = rnd.choices(unknown, weights)[0]
+        elif r < 0.9:
+            text = " ".join(rnd.choice(known + unknown) for _ in range(rnd.randint(3, 6)))
+        else:
+            text = "/tr " + rnd.choice(known + unknown)
+        updates.append(text_update(i, 10_000 + i, text))
+    return updates
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+async def wait_health(http: ClientSession, url: str, proc: subprocess.Popen) -> None:
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"bot.py exited with {proc.returncode}")
+        try:
+            async with http.get(url) as r:
+                if r.status == 200:
+                    return
+        except ClientError:
+            pass
+        await asyncio.sleep(0.05)
+
+
+async def main(args) -> dict:
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            updates = [json.loads(line) for line in f if line.strip()]
+    else:
+        updates = synthetic(args.updates)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(u, ensure_ascii=False) + "\n" for u in updates)
+
+    posted_at: dict[int, deque[float]] = defaultdict(deque)
+    latencies: list[float] = []
+
+    def on_reply(method: str, chat_id: int, text: str, t: float) -> None:
+        if method == "sendMessage" and posted_at[chat_id]:
+            latencies.append(t - posted_at[chat_id].popleft())
+
+    glosbe = await FakeGlosbe(latency=args.glosbe_latency, error_rate=args.glosbe_errors, page=args.page).start()
+    api = await FakeBotAPI(listener=on_reply).start()
+    port = free_port()
+    env = {
+        **os.environ,
+        "BOT_TOKEN": "123456:TEST", "BASE_URL": "http://127.0.0.1", "PORT": str(port), "SKIP_WEBHOOK": "0",
+        "TELEGRAM_API_URL": api.url, "GLOSBE_BASE_URL": glosbe.url, "AK_CACHE_DB": "", "AK_QUERY_LOG": "",
+    }
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "bot.py")], env=env,
+                            stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    statuses: dict[int, int] = defaultdict(int)
+    try:
+        async with ClientSession(timeout=ClientTimeout(total=30)) as http:
+            await wait_health(http, base + "/health", proc)
+            rss_idle = proc_status(proc.pid)["VmRSS"]
+            calls_before = dict(api.calls)
+
+            async def post(update: dict) -> None:
+                chat = (update.get("message") or {}).get("chat", {}).get("id")
+                sent = time.perf_counter()
+                if chat is not None:
+                    posted_at[chat].append(sent)
+                status = 0
+                try:
+                    async with http.post(base + "/webhook", json=update) as r:
+                        status = r.status
+                except (ClientError, asyncio.TimeoutError):
+                    pass
+                statuses[status] += 1
+                if status != 200 and chat is not None:
+                    posted_at[chat].remove(sent)  # не принят (503) — ответа на него не будет
+
+            t0 = time.perf_counter()
+            tasks = []
+            for i, update in enumerate(updates):
+                delay = t0 + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(post(update)))
+            await asyncio.gather(*tasks)
+            posted = time.perf_counter() - t0
+
+            # ждём, пока ответы перестанут приходить
+            last, idle_since = -1, time.perf_counter()
+            while time.perf_counter() - idle_since < args.idle:
+                if len(latencies) != last:
+                    last, idle_since = len(latencies), time.perf_counter()
+                await asyncio.sleep(0.05)
+            elapsed = idle_since - t0
+            mem = proc_status(proc.pid)
+            async with http.get(base + "/webhook_stats") as r:
+                webhook = await r.json()
+    finally:
+        proc.terminate()
+        proc.wait()
+        await api.stop()
+        await glosbe.stop()
+
+    calls = {k: v - calls_before.get(k, 0) for k, v in api.calls.items() if v - calls_before.get(k, 0)}
+    return {
+        "updates": len(updates),
+        "rate_target": args.rate,
+        "posted_s": round(posted, 3),
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_s": round(webhook["processed"] / elapsed, 1) if elapsed else 0.0,
+        "replies": len(latencies),
+        "latency_ms": {f"p{int(q * 100)}": round(percentile(latencies, q) * 1000, 1) for q in (0.5, 0.95, 0.99)},
+        "webhook_status": dict(statuses),
+        "webhook": {k: webhook[k] for k in ("processed", "failed", "rejected", "duplicates")},
+        "glosbe_requests": glosbe.requests,
+        "glosbe_max_concurrent": glosbe.max_active,
+        "bot_api_calls": calls,
+        "rss_mb": {"idle": round(rss_idle, 1), "end": round(mem["VmRSS"], 1), "peak": round(mem["VmHWM"], 1)},
+    }
+
+
+def report(r: dict) -> None:
+    lat = r["latency_ms"]
+    print(f"updates {r['updates']} at {r['rate_target']}/s: posted in {r['posted_s']:.2f}s, "
+          f"done in {r['elapsed_s']:.2f}s -> {r['updates_per_s']:.1f} updates/s")
+    print(f"end-to-end latency (POST -> first reply): p50 {lat['p50']:.1f} ms  p95 {lat['p95']:.1f} ms  "
+          f"p99 {lat['p99']:.1f} ms  ({r['replies']} replies)")
+    print(f"webhook responses {r['webhook_status']}  worker pool {r['webhook']}")
+    print(f"outbound: glosbe {r['glosbe_requests']} (max concurrent {r['glosbe_max_concurrent']}), "
+          f"bot api {r['bot_api_calls']}")
+    rss = r["rss_mb"]
+    print(f"bot.py RSS: idle {rss['idle']:.1f} MB, end {rss['end']:.1f} MB, peak {rss['peak']:.1f} MB")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--updates", type=int, default=2000)
+    p.add_argument("--rate", type=float, default=200.0, help="updates per second")
+    p.add_argument("--glosbe-latency", type=float, default=0.05)
+    p.add_argument("--glosbe-errors", type=float, default=0.0)
+    p.add_argument("--page", default="small", help="fixture page (fixtures.py): small, large, escaped, ...")
+    p.add_argument("--replay", help="JSONL file with recorded Telegram updates")
+    p.add_argument("--save", help="write the replayed updates to this JSONL file")
+    p.add_argument("--idle", type=float, default=2.0, help="stop after this many seconds without replies")
+    p.add_argument("--json", help="write the report as JSON (for comparing runs)")
+    p.add_argument("--max-p95", type=float, help="exit 1 if p95 latency is above this, ms")
+    p.add_argument("--verbose", action="store_true", help="show bot.py stderr")
+    args = p.parse_args()
+    result = asyncio.run(main(args))
+    report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.max_p95 is not None and result["latency_ms"]["p95"] > args.max_p95:
+        print(f"FAIL: p95 {result['latency_ms']['p95']} ms > {args.max_p95} ms")
+        sys.exit(1)
@@ -0,0 +1,70 @@
+# bench/bench_http_pool.py — разовая сессия на каждый перевод vs общий пул (akambash_extra)
+#
+# Поднимает локальный stand-in Glosbe, гоняет загрузку страницы N раз в обоих
+# режимах и печатает латентность на запрос и число открытых сокетов.
+#
+#   python bench/bench_http_pool.py [N]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aiohttp import web
+
+PAGE = (
+    '<html><head><script id="__NEXT_DATA__" type="application/json">'
+    '{"props":{"pageProps":{"translations":[{"displayText":"аиқәшаҳаҭра"}]}}}'
+    "</script></head><body></body></html>"
+)
+
+
+async def start_server():
+    sockets = set()
+
+    async def page(request):
+        sockets.add(request.transport)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{src}/{dst}/{term}", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port, sockets
+
+
+async def run(extra, n: int, pooled: bool, sockets: set) -> tuple[float, int]:
+    sockets.clear()
+    session = extra.make_glosbe_session() if pooled else None
+    extra.set_glosbe_session(session)
+    try:
+        t0 = time.perf_counter()
+        for i in range(n):
+            await extra._gl_lookup(f"слово{i}", "ru", "ab")  # мимо кэша
+        elapsed = time.perf_counter() - t0
+    finally:
+        extra.set_glosbe_session(None)
+        if session is not None:
+            await session.close()
+    return elapsed / n * 1000, len(sockets)
+
+
+async def main(n: int):
+    runner, port, sockets = await start_server()
+    os.environ["GLOSBE_BASE_URL"] = f"http://127.0.0.1:{port}"
+    import akambash_extra as extra
+    extra.GL_BASE_URL = os.environ["GLOSBE_BASE_URL"]
+    try:
+        for label, pooled in (("per-request session", False), ("pooled session", True)):
+            ms, opened = await run(extra, n, pooled, sockets)
+            print(f"{label:<20} {ms:8.3f} ms/req   sockets opened: {opened}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
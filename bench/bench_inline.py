@@ -0,0 +1,66 @@
+# bench/bench_inline.py — задержка inline-подсказок на каждое нажатие клавиши
+#
+# Повторяет набор всех заголовков словаря буква за буквой («м», «мо», «мор», …)
+# через inline_articles() — тот же путь, что и хэндлер до query.answer().
+# Меряется холодный (пустой кэш префиксов) и тёплый проход; для масштаба —
+# ещё и синтетический словарь на 100k записей.
+#
+#   python bench/bench_inline.py [SYNTHETIC_ENTRIES]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("AK_CACHE_DB", "")
+
+import ak_dict
+import akambash_extra as extra
+
+ALPHABET = "абвгдежзиклмнопрстуфхцчшыэюяәҳҭқԥ"
+
+
+def synthetic(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+    word = lambda: "".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(3, 12)))
+    return [{"ru": word(), "ab": "а" + word(), "lat": f"w{i}", "tr": f"k{i}"} for i in range(n)]
+
+
+def keystrokes(d: ak_dict.Dictionary, limit: int = 3000):
+    words = [e[lang] for e in d.entries[:limit] for lang in ("ru", "ab", "tr", "lat") if e.get(lang)]
+    for w in words:
+        for i in range(1, len(w) + 1):
+            yield w[:i]
+
+
+def replay(d: ak_dict.Dictionary) -> list[float]:
+    ak_dict._DICT = d
+    out = []
+    clock = time.perf_counter
+    for prefix in keystrokes(d):
+        t0 = clock()
+        extra.inline_articles(prefix)
+        out.append(clock() - t0)
+    return out
+
+
+def report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+    print(f"{label:<26} n={len(samples):<7} p50 {pct(0.50):7.3f} ms  p99 {pct(0.99):7.3f} ms  max {samples[-1] * 1000:7.3f} ms")
+
+
+def main(n: int):
+    for label, d in (("bundled", ak_dict.load_dictionary()), (f"synthetic {n}", ak_dict.Dictionary(synthetic(n)))):
+        t0 = time.perf_counter()
+        d.prefix_index()
+        print(f"{label}: prefix index over {len(d.prefix_index())} keys built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        extra._INLINE_CACHE.clear()
+        report(f"{label} cold", replay(d))
+        warm = replay(d)
+        report(f"{label} warm", warm)
+        assert sorted(warm)[int(len(warm) * 0.99)] < 0.050, "p99 over 50 ms"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
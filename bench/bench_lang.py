@@ -0,0 +1,56 @@
+# bench/bench_lang.py — скорость и точность detect_lang (ak_lang) против langdetect
+#
+# Точность считается по всем словам akambash_dict.json: поле ru → "ru",
+# ab → "ab", tr → "tr", lat → "ab"; если слово совпадает в двух языках
+# («абба́т», «agronom»), верны оба ответа. detect_lang обязан угадать всё
+# (ошибка — ненулевой код выхода, как у bench_translit).
+#
+#   python bench/bench_lang.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ak_dict import get_dictionary, normalize
+from ak_lang import _langdetect, detect_lang
+
+
+def samples():
+    d = get_dictionary()
+    for e in d.entries:
+        yield e["ru"], {"ru"}
+        yield e["tr"], {"tr"}
+        yield e["lat"], {"ab", "tr"} if normalize(e["lat"]) in d.index["tr"] else {"ab"}
+        # «абба́т» одинаково по-русски и по-абхазски — оба ответа верны
+        yield e["ab"], {"ab", "ru"} if normalize(e["ab"]) in d.index["ru"] else {"ab"}
+
+
+def accuracy(fn, data):
+    ok = sum(1 for text, expected in data if fn(text) in expected)
+    return ok / len(data)
+
+
+def per_call_us(fn, data, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for text, _ in data:
+            fn(text)
+    return (time.perf_counter() - t0) / (rounds * len(data)) * 1e6
+
+
+def main():
+    data = list(samples())
+    langdetect = lambda t: {"ru": "ru", "en": "en", "tr": "tr"}.get(_langdetect(t) or "", "ru")
+    t0 = time.perf_counter()
+    langdetect("warm up")
+    print(f"langdetect first call (profile load): {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"words: {len(data)}")
+    for label, fn, rounds in (("detect_lang", detect_lang, 200), ("langdetect", langdetect, 3)):
+        print(f"{label:<12} accuracy {accuracy(fn, data):6.1%}   {per_call_us(fn, data, rounds):9.1f} us/call")
+    wrong = [(text, sorted(expected), detect_lang(text)) for text, expected in data if detect_lang(text) not in expected]
+    assert not wrong, f"detect_lang mistakes: {wrong[:10]}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# bench/bench_metrics.py — цена метрик на один перевод
+#
+# Один запрос пишет примерно столько: detect, fetch (попытка 1), parse_next_data,
+# translate_total, telegram_send — 5 observe() с perf_counter() и 2 inc().
+#
+#   python bench/bench_metrics.py [N]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ak_metrics import Registry
+
+
+def main(n: int):
+    reg = Registry()
+    stages = [reg.histogram("ak_stage_seconds", "bench", {"stage": s})
+              for s in ("detect", "fetch", "parse_next_data", "translate_total", "telegram_send")]
+    hit = reg.counter("ak_translate_outcome_total", "bench", {"outcome": "hit"})
+    miss = reg.counter("ak_translate_outcome_total", "bench", {"outcome": "miss"})
+    clock = time.perf_counter
+
+    def instrumented():
+        for h in stages:
+            started = clock()
+            h.observe(clock() - started)
+        hit.inc()
+        miss.inc()
+
+    def baseline():
+        for h in stages:
+            started = clock()
+            clock() - started
+
+    results = {}
+    for label, fn in (("baseline (timers only)", baseline), ("instrumented", instrumented)):
+        t0 = clock()
+        for _ in range(n):
+            fn()
+        results[label] = (clock() - t0) / n * 1e6
+        print(f"{label:<24} {results[label]:6.3f} us/request")
+    overhead = results["instrumented"] - results["baseline (timers only)"]
+    print(f"recording overhead       {overhead:6.3f} us/request "
+          f"(total with timers {results['instrumented']:.3f} us)")
+
+    t0 = clock()
+    body = reg.render()
+    print(f"render /metrics          {(clock() - t0) * 1000:6.3f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
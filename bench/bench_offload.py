@@ -0,0 +1,60 @@
+# bench/bench_offload.py — задержка event loop при разборе тяжёлых страниц: inline / thread / process
+#
+# Fake Glosbe отдаёт экранированную страницу (~700 KB, полный разбор json).
+# Параллельно идут N поисков мимо кэша, LoopLagMonitor с шагом 10 мс меряет,
+# насколько цикл опаздывает — столько же ждали бы остальные чаты.
+#
+#   python bench/bench_offload.py [N] [PAGE]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("AK_CACHE_DB", "")
+
+import akambash_extra as extra
+from ak_offload import CpuOffload, LoopLagMonitor
+from fakes import FakeGlosbe
+
+
+class Samples(list):
+    observe = list.append
+
+    def pct(self, q: float) -> float:
+        s = sorted(self)
+        return s[min(len(s) - 1, int(q * len(s)))] if s else 0.0
+
+
+async def run(mode: str, n: int, url: str) -> None:
+    extra.GL_CPU = CpuOffload(mode=mode, workers=2)
+    lags = Samples()
+    monitor = LoopLagMonitor(interval=0.01, warn_after=1.0, histogram=lags)
+    await monitor.start()
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(extra._gl_lookup(f"слово{i}", "ru", "ab") for i in range(n)))
+    elapsed = time.perf_counter() - t0
+    await monitor.stop()
+    await extra.GL_CPU.close()
+    assert all(r[0]["primary"] for r in results), mode
+    print(f"{mode:<8} {elapsed * 1000:8.0f} ms  loop lag p50 {lags.pct(0.5) * 1000:6.1f}  "
+          f"p99 {lags.pct(0.99) * 1000:6.1f}  max {max(lags, default=0) * 1000:6.1f} ms")
+
+
+async def main(n: int, page: str):
+    glosbe = await FakeGlosbe(latency=0.01, page=page).start()
+    extra.GL_BASE_URL = glosbe.url
+    session = extra.make_glosbe_session()
+    extra.set_glosbe_session(session)
+    try:
+        print(f"page: {page}, lookups: {n}")
+        for mode in ("inline", "thread", "process"):
+            await run(mode, n, glosbe.url)
+    finally:
+        extra.set_glosbe_session(None)
+        await session.close()
+        await glosbe.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 40, sys.argv[2] if len(sys.argv) > 2 else "escaped"))
@@ -0,0 +1,55 @@
+# bench/bench_parse.py — время и пиковая память разбора страниц Glosbe
+#
+# legacy — прежний путь: regex по всей странице + unescape + json.loads + обход дерева.
+# parse  — _gl_parse_page: точечное извлечение массивов переводов, затем fallback'и.
+# Результаты обязаны совпадать целиком (fixtures.py: страницы с разным порядком ключей),
+# а пик памяти точечного разбора — оставаться малым: блок не копируется.
+#
+#   python bench/bench_parse.py [ROUNDS]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("AK_CACHE_DB", "")
+
+import akambash_extra as extra
+from fixtures import build
+
+PEAK_LIMIT_KB = 64  # кроме escaped: там полный разбор, как у legacy
+
+
+def legacy(page: str) -> list[str]:
+    next_data = extra._gl_extract_next_data(page)
+    translations = extra._gl_pull_translations_from_next(next_data) if next_data else []
+    return translations or extra._gl_pull_translations_from_html(page)
+
+
+def measure(fn, page: str, rounds: int) -> tuple[float, int, list[str]]:
+    result = fn(page)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(page)
+    ms = (time.perf_counter() - t0) / rounds * 1000
+    tracemalloc.start()
+    fn(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ms, peak, result
+
+
+def main(rounds: int):
+    print(f"{'page':<11} {'KB':>6}  {'legacy ms':>9} {'peak KB':>8}  {'parse ms':>9} {'peak KB':>8}  variants")
+    for name, page in build().items():
+        old_ms, old_peak, old = measure(legacy, page, rounds)
+        new_ms, new_peak, new = measure(extra._gl_parse_page, page, rounds)
+        # тот же список в том же порядке, что у полного разбора, при любом порядке ключей
+        assert new == old[:extra.GL_MAX_VARIANTS], (name, old[:5], new[:5])
+        assert name == "escaped" or new_peak < PEAK_LIMIT_KB * 1024, (name, new_peak // 1024)
+        print(f"{name:<11} {len(page.encode()) // 1024:>6}  {old_ms:9.3f} {old_peak // 1024:8}  "
+              f"{new_ms:9.3f} {new_peak // 1024:8}  {len(new)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,79 @@
+# bench/bench_phrase.py — перевод предложения: 10 поисков подряд vs translate_phrase
+#
+# Fake Glosbe с задержкой LATENCY на запрос; слова предложения не в словаре,
+# кроме двух. Настройки по умолчанию, фраза — из чата, как у бота: промахи
+# (10 слов ≤ GLOSBE_PHRASE_CONCURRENCY) идут разом, фраза должна занять меньше
+# двух одиночных поисков.
+# Затем две фразы подряд из одного чата, пока слоты заняты другими чатами:
+# слова одной не должны вытеснять слова другой — обе переведены целиком.
+#
+#   python bench/bench_phrase.py [LATENCY]
+import asyncio
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+os.environ.setdefault("AK_CACHE_DB", "")
+
+from fakes import FakeGlosbe
+
+SENTENCE = "мой договор и абажур лежат где то далеко за синим тёплым морем"
+NEXT = "твой забор и гараж стоят где то близко у старого холодного моря"
+CHAT = 1
+
+
+async def main(latency: float):
+    glosbe = await FakeGlosbe(latency=latency).start()
+    import akambash_extra as extra
+    extra.GL_BASE_URL = glosbe.url
+    session = extra.make_glosbe_session()
+    extra.set_glosbe_session(session)
+    try:
+        words = extra.tokenize(SENTENCE)
+        t0 = time.perf_counter()
+        for w in words:
+            await extra.translate_to_abkhaz(w + "·seq")  # суффикс — мимо кэша
+        sequential = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        await extra.translate_to_abkhaz("одиночное·слово", chat=CHAT)
+        single = time.perf_counter() - t0
+
+        updates = []
+
+        async def on_update(segments, final):
+            updates.append(sum(seg["value"] is not None for seg in segments))
+
+        t0 = time.perf_counter()
+        res = await extra.translate_phrase(SENTENCE, chat=CHAT, on_update=on_update)
+        phrase = time.perf_counter() - t0
+
+        others = [asyncio.create_task(extra.translate_to_abkhaz(f"шум{i}", chat=100 + i))
+                  for i in range(extra.GL_SCHEDULER.max_concurrent)]  # все слоты заняты, очередь не переполнена
+        first = asyncio.create_task(extra.translate_phrase(NEXT + " ·1", chat=CHAT))
+        await asyncio.sleep(latency / 2)
+        second = await extra.translate_phrase(NEXT + " ·2", chat=CHAT)
+        first = await first
+        await asyncio.gather(*others)
+    finally:
+        extra.set_glosbe_session(None)
+        await session.close()
+        await glosbe.stop()
+
+    print(f"words {len(words)}, segments {len(res['segments'])}, glosbe latency {latency * 1000:.0f} ms")
+    print(f"sequential lookups  {sequential * 1000:8.1f} ms")
+    print(f"single lookup       {single * 1000:8.1f} ms")
+    print(f"translate_phrase    {phrase * 1000:8.1f} ms  (partial updates: {updates})")
+    print(extra.render_phrase(res["segments"], res["dst"]))
+    assert phrase < 2 * single, f"phrase {phrase * 1000:.0f} ms >= 2 x single lookup {single * 1000:.0f} ms"
+    for r in (first, second):
+        missing = [seg["text"] for seg in r["segments"] if not seg["value"]]
+        assert not missing, (r["query"], missing)
+    print("two phrases in a row from one chat: both fully translated")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.1))
@@ -0,0 +1,99 @@
+# bench/bench_prewarm.py — журнал запросов и прогрев кэша после «редеплоя»
+#
+# 1) QueryLog: стоимость record() на горячем пути, пакетная запись и ротация.
+# 2) Прогрев: журнал с Zipf-распределением запросов, пустой кэш, fake Glosbe.
+#    Сравнивается задержка первых пользователей на топ-запросах без прогрева
+#    и после prewarm_popular() (сколько загрузок, сколько пропущено как словарные).
+#
+#   python bench/bench_prewarm.py [TOP]
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+os.environ.setdefault("AK_CACHE_DB", "")
+
+import akambash_extra as extra
+from ak_cache import TranslationCache
+from ak_querylog import QueryLog, top_queries
+from fakes import FakeGlosbe
+
+
+def write_log(path: str, n: int, seed: int = 17) -> None:
+    rnd = random.Random(seed)
+    with open(os.path.join(HERE, "..", "akambash_dict.json"), encoding="utf-8") as f:
+        known = [e["ru"] for e in json.load(f)]
+    unknown = [f"слово{k}" for k in range(2000)]
+    weights = [1 / (k + 1) for k in range(len(unknown))]
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(n):
+            q = rnd.choice(known) if rnd.random() < 0.4 else rnd.choices(unknown, weights)[0]
+            f.write(json.dumps({"ts": 0, "q": q, "src": "ru", "dst": "ab", "source": "?"}, ensure_ascii=False) + "\n")
+
+
+async def bench_writer(tmp: str, n: int = 200_000) -> None:
+    qlog = QueryLog(os.path.join(tmp, "log.jsonl"), max_buffer=n, max_bytes=2 * 2**20, flush_interval=0.05)
+    await qlog.start()
+    t0 = time.perf_counter()
+    for i in range(n):
+        qlog.record(f"слово{i % 5000}", "ru", "ab", "glosbe")
+        if i % 1000 == 0:
+            await asyncio.sleep(0)  # как обычный цикл с хэндлерами: фоновая запись успевает
+    record = time.perf_counter() - t0
+    await qlog.stop()
+    s = qlog.snapshot()
+    print(f"query log: record() {record / n * 1e6:.2f} us/call, {s['written']} written in "
+          f"{s['flushes']} flushes, {s['rotations']} rotations, dropped {s['dropped']}")
+
+
+async def first_users(queries: list[tuple[str, str, str, int]]) -> float:
+    t0 = time.perf_counter()
+    await asyncio.gather(*(extra.translate_to_abkhaz(q, src, chat=i) for i, (q, src, _, _) in enumerate(queries)))
+    return time.perf_counter() - t0
+
+
+async def main(top: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        await bench_writer(tmp)
+
+        log_path = os.path.join(tmp, "requests.jsonl")
+        write_log(log_path, 50_000)
+        t0 = time.perf_counter()
+        queries = top_queries(log_path, top)
+        print(f"top_queries over 50000 lines: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        glosbe = await FakeGlosbe(latency=0.3).start()
+        extra.GL_BASE_URL = glosbe.url
+        extra.QUERY_LOG = QueryLog(log_path)  # не запущен: запросы бенчмарка в файл не попадут
+        session = extra.make_glosbe_session()
+        extra.set_glosbe_session(session)
+        try:
+            extra.GL_CACHE = TranslationCache(None)
+            cold = await first_users(queries)
+            cold_requests = glosbe.requests
+
+            extra.GL_CACHE = TranslationCache(None)
+            extra.PREWARM_RATE = 0  # без ограничения
+            t0 = time.perf_counter()
+            await extra.prewarm_popular(top)
+            warm_up = time.perf_counter() - t0
+            fetched = glosbe.requests - cold_requests
+            warm = await first_users(queries)
+        finally:
+            extra.set_glosbe_session(None)
+            await session.close()
+            await glosbe.stop()
+        print(f"prewarm: {extra.PREWARM_STATS} in {warm_up:.1f}s ({fetched} Glosbe requests)")
+        print(f"first {len(queries)} users: cold {cold * 1000:.0f} ms ({cold_requests} Glosbe requests), "
+              f"warm {warm * 1000:.0f} ms ({glosbe.requests - cold_requests - fetched} Glosbe requests)")
+        assert glosbe.requests - cold_requests - fetched == 0
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100))
@@ -0,0 +1,87 @@
+# bench/bench_sched_load.py — нагрузка на авто-перевод через /webhook
+#
+# Тысячи чатов шлют по несколько сообщений подряд; Glosbe и Bot API — локальные
+# заменители. Проверяем, что исходящих запросов одновременно не больше
+# GLOSBE_CONCURRENCY, старые сообщения чата вытесняются новыми, а при перегрузке
+# пользователь получает ответ «попробуй позже». На 503 (очередь апдейтов полна)
+# апдейт шлётся заново с паузой, как делает Telegram, — доходят все.
+# Настройки по умолчанию: GLOSBE_MAX_PENDING = WEBHOOK_WORKERS / 2, перегрузка
+# должна доходить до пользователя без подкрутки лимитов.
+#
+#   python bench/bench_sched_load.py [CHATS] [MSGS_PER_CHAT]
+import asyncio
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from aiohttp import ClientSession, web
+
+from fakes import FakeBotAPI, FakeGlosbe, text_update
+
+
+async def main(chats: int, per_chat: int):
+    glosbe = await FakeGlosbe(latency=0.05).start()
+    api = await FakeBotAPI().start()
+    os.environ.update({
+        "BOT_TOKEN": "123456:TEST", "BASE_URL": "http://127.0.0.1", "TELEGRAM_API_URL": api.url,
+        "GLOSBE_BASE_URL": glosbe.url, "AK_CACHE_DB": "", "AK_QUERY_LOG": "", "SKIP_WEBHOOK": "0",
+    })
+    import bot
+    import akambash_extra as extra
+
+    runner = web.AppRunner(await bot.app_factory(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}{bot.WEBHOOK_PATH}"
+
+    t0 = time.perf_counter()
+    update_id = 0
+    statuses: dict[int, int] = {}
+    async with ClientSession() as http:
+        async def post(update):
+            delay = 0.1
+            while True:
+                async with http.post(url, json=update) as r:
+                    statuses[r.status] = statuses.get(r.status, 0) + 1
+                    if r.status != 503:
+                        return
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 2.0)
+        batch = []
+        for chat in range(1, chats + 1):
+            for k in range(per_chat):  # сообщения чата — подряд, пока предыдущие ещё ждут перевода
+                update_id += 1
+                batch.append(post(text_update(update_id, chat, f"слово{chat}ж{k}")))
+        await asyncio.gather(*batch)
+    posted = time.perf_counter() - t0
+
+    sched = extra.GL_SCHEDULER
+    while sched.snapshot()["active"] or sched.snapshot()["pending"]:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - t0
+
+    busy = sum(1 for _, _, text in api.sent if text == extra.BUSY_TEXT)
+    s = sched.snapshot()
+    print(f"chats {chats} x {per_chat} msgs = {update_id} updates, posted in {posted:.2f}s, drained in {elapsed:.2f}s")
+    print(f"webhook responses {statuses} (503 = update queue full, resent)")
+    print(f"glosbe requests {glosbe.requests}, max concurrent {glosbe.max_active} (cap {sched.max_concurrent})")
+    print(f"superseded {s['superseded']}, overloaded {s['overloaded']}, replies {len(api.sent)} (busy {busy})")
+    assert glosbe.max_active <= sched.max_concurrent
+    assert statuses.get(200) == update_id, statuses
+    assert s["superseded"] > 0 and s["overloaded"] > 0 and busy > 0, s
+    assert len(api.sent) == update_id - s["superseded"]  # ответ получили все, кроме вытесненных
+
+    await runner.cleanup()
+    await api.stop()
+    await glosbe.stop()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [2000, 3][len(args):])))
@@ -0,0 +1,100 @@
+# bench/bench_startup.py — холодный старт bot.py: JSON-словарь против собранного .akd
+#
+# Генерирует словарь на N записей (pretty-printed JSON, как akambash_dict.json),
+# собирает из него .akd и дважды запускает `python bot.py` в SKIP_WEBHOOK-режиме:
+#   json — AK_DICT_BIN="" (разбор JSON + индексы в памяти),
+#   akd  — mmap артефакта.
+# Меряется время до первого 200 от /health, до первого ответа из словаря
+# (/test_glosbe по слову из словаря — без сети) и RSS процесса в обе точки.
+#
+#   python bench/bench_startup.py [N]
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+ALPHABET = "абвгдежзиклмнопрстуфхцчшыэюяәҳҭқԥ"
+
+
+def synthetic(n: int, seed: int = 15) -> list[dict]:
+    rnd = random.Random(seed)
+    word = lambda: "".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(3, 12)))
+    return [{"ru": f"слово{i}", "ab": "а" + word(), "lat": f"w{i}", "tr": f"kelime{i}"} for i in range(n)]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def wait_ok(session: aiohttp.ClientSession, url: str, proc: subprocess.Popen, check=lambda body: True):
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"bot.py exited with {proc.returncode}")
+        try:
+            async with session.get(url) as resp:
+                if resp.status == 200 and check(await resp.json()):
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.005)
+
+
+async def run(label: str, env: dict, word: str) -> None:
+    port = free_port()
+    env = {**os.environ, **env, "SKIP_WEBHOOK": "1", "PORT": str(port), "AK_CACHE_DB": "", "AK_QUERY_LOG": ""}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "bot.py")], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        async with aiohttp.ClientSession() as session:
+            base = f"http://127.0.0.1:{port}"
+            await wait_ok(session, base + "/health", proc)
+            health, health_rss = time.perf_counter() - t0, rss_mb(proc.pid)
+            await wait_ok(session, f"{base}/test_glosbe?q={word}", proc,
+                          lambda body: body["data"].get("source") == "dict")
+            first, first_rss = time.perf_counter() - t0, rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{label:<5} /health {health * 1000:7.0f} ms {health_rss:6.1f} MB   "
+          f"first dict answer {first * 1000:7.0f} ms {first_rss:6.1f} MB")
+
+
+async def main(n: int):
+    from ak_dictbin import build
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, bin_path = os.path.join(tmp, "dict.json"), os.path.join(tmp, "dict.akd")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(synthetic(n), f, ensure_ascii=False, indent=2)
+        t0 = time.perf_counter()
+        build(json_path, bin_path)
+        print(f"entries: {n}  json {os.path.getsize(json_path) / 2**20:.1f} MB  "
+              f"akd {os.path.getsize(bin_path) / 2**20:.1f} MB (built in {time.perf_counter() - t0:.1f} s)")
+        word = f"слово{n - 1}"
+        await run("json", {"AK_DICT_PATH": json_path, "AK_DICT_BIN": ""}, word)
+        await run("akd", {"AK_DICT_PATH": json_path, "AK_DICT_BIN": bin_path}, word)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,69 @@
+# bench/bench_translit.py — соответствие ak_translit полю lat и скорость на большом корпусе
+#
+# 1) Каждое слово ab из akambash_dict.json транслитерируется и сравнивается с lat
+#    (lat в словаре записан строчными, поэтому сравнение без учёта регистра).
+# 2) Корпус из N случайных абхазских слов: наивная цепочка str.replace против
+#    transliterate() по слову и transliterate_many() одним пакетом.
+#
+#   python bench/bench_translit.py [N]
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from ak_dict import DICT_PATH
+from ak_translit import RULES, transliterate, transliterate_many
+
+
+def conformance() -> int:
+    with open(DICT_PATH, encoding="utf-8") as f:
+        entries = json.load(f)
+    bad = [(e["ab"], e["lat"], transliterate(e["ab"]))
+           for e in entries if e.get("ab") and e.get("lat")
+           and transliterate(e["ab"]).lower() != e["lat"].lower()]
+    for ab, want, got in bad:
+        print(f"  MISMATCH {ab!r}: want {want!r}, got {got!r}")
+    print(f"conformance: {len(entries) - len(bad)}/{len(entries)} lat values match")
+    return len(bad)
+
+
+def naive(text: str) -> str:
+    # так выглядела бы реализация «в лоб»: убрать ударения, диграфы первыми, потом буквы
+    text = text.replace("\u0301", "").replace("\u0300", "")
+    for src in sorted(RULES, key=len, reverse=True):
+        text = text.replace(src, RULES[src]).replace(src.capitalize(), RULES[src].capitalize())
+    return text
+
+
+def corpus(n: int) -> list[str]:
+    rnd = random.Random(13)
+    letters = [k for k in RULES if len(k) == 1] + ["хь", "\u0301"]
+    return ["".join(rnd.choice(letters) for _ in range(rnd.randint(3, 12))) for _ in range(n)]
+
+
+def timed(label: str, fn, n: int) -> list[str]:
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<22} {dt * 1000:8.1f} ms   {dt / n * 1e6:6.2f} us/word")
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    if conformance():
+        sys.exit(1)
+    words = corpus(n)
+    print(f"corpus: {n} words")
+    a = timed("str.replace chain", lambda: [naive(w) for w in words], n)
+    b = timed("transliterate()", lambda: [transliterate(w) for w in words], n)
+    c = timed("transliterate_many()", lambda: transliterate_many(words), n)
+    assert a == b == c, "implementations disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# bench/fakes.py — локальные заменители Glosbe и Telegram Bot API для нагрузочных тестов
+import asyncio
+import itertools
+import random
+import time
+
+from aiohttp import web
+
+from fixtures import build as build_pages
+
+
+class FakeGlosbe:
+    """Отдаёт страницы-фикстуры с заданной задержкой и долей ошибок (503)."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, page: str = "small", seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page = build_pages()[page]
+        self.rnd = random.Random(seed)
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.port = 0
+        self._runner = None
+
+    async def handle(self, request):
+        self.requests += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.rnd.random() < self.error_rate:
+                return web.Response(status=503)
+            return web.Response(text=self.page, content_type="text/html")
+        finally:
+            self.active -= 1
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{src}/{dst}/{term}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+class FakeBotAPI:
+    """
+    Отвечает на методы Bot API как Telegram; запоминает, когда какой чат получил ответ.
+    listener(method, chat_id, text, t) — если задан, вызывается на каждый sendMessage/editMessageText.
+    """
+
+    def __init__(self, listener=None):
+        self.calls: dict[str, int] = {}
+        self.sent: list[tuple[float, int, str]] = []  # (время, chat_id, текст)
+        self.listener = listener
+        self._ids = itertools.count(1)
+        self.port = 0
+        self._runner = None
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        data = await request.post()
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(data.get("chat_id", 0))
+            text = data.get("text", "")
+            now = time.perf_counter()
+            self.sent.append((now, chat_id, text))
+            if self.listener is not None:
+                self.listener(method, chat_id, text, now)
+            result = {
+                "message_id": int(data.get("message_id") or next(self._ids)),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": text,
+            }
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "akambash", "username": "akambash_bot"}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def text_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": f"u{chat_id}"},
+            "text": text,
+        },
+    }
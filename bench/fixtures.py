@@ -0,0 +1,91 @@
+# bench/fixtures.py — детерминированные страницы в духе glosbe.com для бенчмарков
+#
+# Страницы генерируются, а не хранятся в репозитории: по размеру и форме
+# повторяют реальные (__NEXT_DATA__ на сотни КБ с примерами употребления).
+#   python bench/fixtures.py DIR   — сохранить страницы в DIR для просмотра
+import html
+import json
+import os
+import random
+import sys
+
+WORDS = ["амшын", "аԥсуа", "ахәыҷы", "ажәа", "аҩны", "ацла", "аӡы", "амра", "амза", "ахьы"]
+
+
+def _next_data(term: str, translations: list[str], examples: int, seed: int, similar: bool = True,
+               layout: str = "summary_first") -> dict:
+    """
+    layout — порядок ключей, от которого не должен зависеть результат разбора:
+      summary_first   — summary.translations раньше translationsData (как на сайте);
+      nested_first    — у translationsData вложенный summary идёт до собственных displayTranslations;
+      examples_first  — примеры (с кавычками и скобками в тексте) раньше переводов,
+                        собственные translations у pageProps — в самом конце.
+    """
+    rnd = random.Random(seed)
+    words = WORDS + ['"цитата"', "{скобка}", "a\\b", "[x]"] if layout == "examples_first" else WORDS
+    sentence = lambda: " ".join(rnd.choice(words) for _ in range(rnd.randint(6, 18)))
+    summary = {"phrase": term, "translations": [{"displayText": t} for t in translations[:3]]}
+    display = [{"displayText": t, "text": t, "pos": "noun", "sources": ["dict"] * 3} for t in translations]
+    related = [{"displayText": w} for w in ("ажәа", "аҩны")]
+    examples_ = [
+        {"id": i, "source": sentence(), "target": sentence(), "meta": {"rank": rnd.random()}}
+        for i in range(examples)
+    ]
+    similar_ = [{"phrase": rnd.choice(WORDS), "translation": [{"text": rnd.choice(WORDS)}]}
+                for _ in range(examples // 10 if similar else 0)]
+    if layout == "nested_first":
+        props = {
+            "term": term,
+            "translationsData": {"summary": {"translations": related}, "displayTranslations": display},
+            "examples": examples_,
+            "similarPhrases": similar_,
+        }
+    elif layout == "examples_first":
+        props = {
+            "term": term,
+            "examples": examples_,
+            "similarPhrases": similar_,
+            "translationsData": {"displayTranslations": display, "summary": summary},
+            "translations": related,
+        }
+    else:
+        props = {
+            "term": term,
+            "summary": summary,
+            "translationsData": {"displayTranslations": display},
+            "examples": examples_,
+            "similarPhrases": similar_,
+        }
+    return {"props": {"pageProps": props}, "page": "/[src]/[dst]/[term]", "buildId": "bench"}
+
+
+def _page(script: str, body: str = "") -> str:
+    head = "<html><head><meta charset='utf-8'><title>glosbe</title>" + "<link rel='x'>" * 50
+    return f'{head}<script id="__NEXT_DATA__" type="application/json">{script}</script></head><body>{body}</body></html>'
+
+
+def build() -> dict[str, str]:
+    tr = ["амшын", "амшын ду", "аӡиа", "амшынеиқә", "аӡ"]
+    pages = {
+        "small": _page(json.dumps(_next_data("море", tr, 40, 1), ensure_ascii=False)),
+        "large": _page(json.dumps(_next_data("море", tr, 2500, 2), ensure_ascii=False)),
+        "large_miss": _page(json.dumps(_next_data("qwerty", [], 2500, 3, similar=False), ensure_ascii=False)),
+        "nested_first": _page(json.dumps(_next_data("море", tr, 2500, 5, layout="nested_first"), ensure_ascii=False)),
+        "examples_1st": _page(json.dumps(_next_data("море", tr, 2500, 6, layout="examples_first"), ensure_ascii=False)),
+        "escaped": _page(html.escape(json.dumps(_next_data("море", tr, 2500, 4), ensure_ascii=False))),
+        "html_only": (
+            "<html><body>" + "<div class='row'>пример</div>" * 3000
+            + "".join(f'<span class="translation__item">{t}</span>' for t in tr)
+            + "</body></html>"
+        ),
+    }
+    return pages
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else "fixtures"
+    os.makedirs(out, exist_ok=True)
+    for name, page in build().items():
+        with open(os.path.join(out, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(page)
+        print(f"{name}.html  {len(page.encode()) // 1024} KB")
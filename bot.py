@@ -4,7 +4,14 @@
 # - Version:            GET /version
 # - Debug akambash_extra GET /debug_extra
 # - Direct Glosbe test: GET /test_glosbe?q=море
-# - Webhook endpoint:   POST /webhook
+# - Source hash:        GET /extra_hash
+# - Translation cache:  GET /cache_stats
+# - Glosbe breaker:     GET /glosbe_stats (breaker, scheduler, attempt timings)
+# - Webhook queue:      GET /webhook_stats
+# - CPU pool + loop lag: GET /cpu_stats
+# - Query log + warm-up: GET /querylog_stats
+# - Prometheus metrics: GET /metrics
+# - Webhook endpoint:   POST /webhook (acked at once, processed by a worker pool)
 # - Local run w/o Telegram: SKIP_WEBHOOK=1
 #
 # ENV:
@@ -13,18 +20,43 @@
 #   PORT        — provided by Render; default 8080 for local
 #   SKIP_WEBHOOK=1 — run without Telegram API (local diagnostics)
 #   APP_VERSION — optional; reported at /version
+#   TELEGRAM_API_URL — optional; local Bot API server (or a stand-in for load tests)
+#   GLOSBE_BASE_URL — optional; override Glosbe host (local stand-in servers)
+#   GLOSBE_DEADLINE — overall seconds budget per Glosbe lookup (default 8)
+#   GLOSBE_CONCURRENCY — max concurrent outbound lookups (default 16)
+#   GLOSBE_PER_CHAT / GLOSBE_PHRASE_CONCURRENCY — lookups running per chat: single messages / words of phrases (2 / 10)
+#   GLOSBE_MAX_PENDING — lookups waiting for a slot before users get "busy" (default WEBHOOK_WORKERS / 2)
+#   WEBHOOK_WORKERS / WEBHOOK_QUEUE — update worker pool size / queue bound (64 / 1000)
+#   AK_CPU_EXECUTOR — thread (default) | process | inline: where page parsing / langdetect run
+#   AK_CPU_WORKERS / AK_CPU_QUEUE / AK_CPU_INLINE_BYTES — pool size / in-flight bound / inline threshold (2 / 64 / 32768)
+#   AK_LOOP_LAG_WARN — log when the event loop is blocked longer than this, seconds (default 0.1)
+#   AK_QUERY_LOG — JSONL log of translation requests (default: requests.jsonl; "" = off; on Render — the disk), rotated at
+#                  AK_QUERY_LOG_MAX_BYTES (10 MB), AK_QUERY_LOG_BACKUPS (3); flushed every AK_QUERY_LOG_FLUSH s
+#   AK_PREWARM_TOP / AK_PREWARM_RATE / AK_PREWARM_DELAY — warm the cache with the N most frequent logged
+#                  queries, lookups per second, delay after startup (200 / 1 / 10; TOP=0 = off, RATE=0 = no limit)
+#   AK_DICT_PATH — offline dictionary JSON (default: akambash_dict.json)
+#   AK_DICT_BIN — compiled dictionary (python ak_dictbin.py; default akambash_dict.akd, mmapped; "" = JSON only)
+#   AK_CACHE_DB — translation cache SQLite path (render.yaml points it at the persistent disk; "" = memory only)
+import hashlib
+import importlib.util
 import os
+import pathlib
+import time
 from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
 # Core Akambash router (start, buttons, vocab, /tr, auto-translate)
-from ak_extra import router as akambash_router
-import ak_extra as extra
+import akambash_extra as extra
 from akambash_extra import router as akambash_router
+from ak_metrics import REGISTRY
+from ak_workers import QueuedRequestHandler, UpdateWorkerPool
 
-# Optionally include your extra routers without failing if files are absent.
+# Optionally include your extra routers: only modules that are actually deployed
+# (a .py file or a package) are imported; find_spec locates them without importing.
 OPTIONAL_ROUTERS = []
 for mod_name, attr in [
     ("routes_custom", "router"),
@@ -32,6 +64,8 @@ for mod_name, attr in [
     ("routes_admin", "router"),
     ("routes_vocab", "router"),
 ]:
+    if importlib.util.find_spec(mod_name) is None:
+        continue
     try:
         module = __import__(mod_name, fromlist=[attr])
         OPTIONAL_ROUTERS.append(getattr(module, attr))
@@ -45,6 +79,18 @@ WEBHOOK_PATH = "/webhook"
 WEBHOOK_URL = (BASE_URL + WEBHOOK_PATH) if BASE_URL else None
 SKIP_WEBHOOK = os.getenv("SKIP_WEBHOOK", "0") == "1"
 APP_VERSION = os.getenv("APP_VERSION", "dev")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "64"))
+WEBHOOK_QUEUE = int(os.getenv("WEBHOOK_QUEUE", "1000"))
+
+
+async def _time_bot_call(make_request, bot, method):
+    """Bot session middleware: latency of every Telegram API call (stage=telegram_send)."""
+    started = time.perf_counter()
+    try:
+        return await make_request(bot, method)
+    finally:
+        extra.M_SEND.observe(time.perf_counter() - started)
 
 
 def _get_translate():
@@ -55,6 +101,18 @@ def _get_translate():
 async def app_factory():
     app = web.Application()
 
+    # Shared pooled HTTP client for Glosbe: opened on startup, closed on shutdown
+    app.cleanup_ctx.append(extra.glosbe_session_ctx)
+    # Query log writer + cache warm-up from popular queries (stopped before the Glosbe client closes)
+    app.cleanup_ctx.append(extra.query_log_ctx)
+    app.on_cleanup.append(extra.close_cache)
+    # Offline dictionary (akambash_dict.json) indexes, built off the event loop
+    app.on_startup.append(extra.preload_dictionary)
+    # CPU pool for page parsing / langdetect + event loop lag monitor
+    app.on_startup.append(extra.LOOP_LAG.start)
+    app.on_cleanup.append(extra.LOOP_LAG.stop)
+    app.on_cleanup.append(extra.close_cpu)
+
     # --- Diagnostics ---
     async def health(_):
         return web.json_response({"ok": True, "version": APP_VERSION})
@@ -70,27 +128,68 @@ async def app_factory():
             "has_translate_to_abkhaz": hasattr(extra, "translate_to_abkhaz"),
             "module_path": getattr(extra, "__file__", None),
             "dir_sample": [n for n in dir(extra) if "translate" in n or "scii" in n][:16],
+            "cache": extra.GL_CACHE.snapshot(),
+            "breaker": extra.GL_BREAKER.snapshot(),
         })
     app.router.add_get("/debug_extra", debug_extra)
 
-# == TEMP: показать sha256 akambash_extra.py на сервере ==
-import hashlib, pathlib
-import akambash_extra as extra  # используем тот же модуль, что и в debug_extra
+    async def cache_stats(_):
+        return web.json_response(extra.GL_CACHE.snapshot())
+    app.router.add_get("/cache_stats", cache_stats)
 
-async def extra_hash(_):
-    path = getattr(extra, '__file__', None)
-    try:
-        data = pathlib.Path(path).read_bytes()
-        digest = hashlib.sha256(data).hexdigest()
-    except Exception as e:
-        return web.json_response({'path': path, 'error': str(e)}, status=500)
-    return web.json_response({
-        'path': path,
-        'sha256': digest,
-        'has_translate': hasattr(extra, 'translate_to_abkhaz')
-    })
-
-app.router.add_get('/extra_hash', extra_hash)
+    # Glosbe circuit breaker state + timings of the latest fetch attempts
+    async def glosbe_stats(_):
+        return web.json_response({
+            "breaker": extra.GL_BREAKER.snapshot(),
+            "deadline": extra.GL_DEADLINE,
+            "scheduler": extra.GL_SCHEDULER.snapshot(),
+            "attempts": list(extra.GL_ATTEMPTS),
+        })
+    app.router.add_get("/glosbe_stats", glosbe_stats)
+
+    # sha256 of akambash_extra.py on the server
+    async def extra_hash(_):
+        path = getattr(extra, "__file__", None)
+        try:
+            digest = hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+        except Exception as e:
+            return web.json_response({"path": path, "error": str(e)}, status=500)
+        return web.json_response({
+            "path": path,
+            "sha256": digest,
+            "has_translate": hasattr(extra, "translate_to_abkhaz"),
+        })
+    app.router.add_get("/extra_hash", extra_hash)
+
+    # Webhook update queue: depth, duplicates (redeliveries), worker utilization
+    update_pool = UpdateWorkerPool(workers=WEBHOOK_WORKERS, maxsize=WEBHOOK_QUEUE)
+
+    async def webhook_stats(_):
+        return web.json_response(update_pool.snapshot())
+    app.router.add_get("/webhook_stats", webhook_stats)
+
+    async def cpu_stats(_):
+        return web.json_response({"cpu": extra.GL_CPU.snapshot(), "loop": extra.LOOP_LAG.snapshot()})
+    app.router.add_get("/cpu_stats", cpu_stats)
+
+    async def querylog_stats(_):
+        return web.json_response({"log": extra.QUERY_LOG.snapshot(), "prewarm": extra.PREWARM_STATS})
+    app.router.add_get("/querylog_stats", querylog_stats)
+
+    # Prometheus-style metrics: stage histograms, outcome counters + component snapshots
+    REGISTRY.snapshot("ak_cache", "Translation cache counters", extra.GL_CACHE.snapshot)
+    REGISTRY.snapshot("ak_breaker", "Glosbe circuit breaker counters", extra.GL_BREAKER.snapshot)
+    REGISTRY.snapshot("ak_scheduler", "Outbound translation scheduler", extra.GL_SCHEDULER.snapshot)
+    REGISTRY.snapshot("ak_webhook", "Webhook update queue", update_pool.snapshot)
+    REGISTRY.snapshot("ak_cpu", "CPU offload pool", extra.GL_CPU.snapshot)
+    REGISTRY.snapshot("ak_loop", "Event loop lag monitor", extra.LOOP_LAG.snapshot)
+    REGISTRY.snapshot("ak_querylog", "Translation query log writer", extra.QUERY_LOG.snapshot)
+    REGISTRY.snapshot("ak_prewarm", "Cache warm-up from popular queries", lambda: extra.PREWARM_STATS)
+
+    async def metrics(_):
+        return web.Response(body=REGISTRY.render().encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+    app.router.add_get("/metrics", metrics)
 
     # Direct Glosbe test without Telegram (useful both locally and on Render)
     async def test_glosbe(request):
@@ -114,7 +213,9 @@ app.router.add_get('/extra_hash', extra_hash)
         if not WEBHOOK_URL:
             raise RuntimeError("BASE_URL is not set; can't build WEBHOOK_URL")
 
-        bot = Bot(TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None
+        bot = Bot(TOKEN, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+        bot.session.middleware(_time_bot_call)
         dp = Dispatcher()
         # include Akambash core router first
         dp.include_router(akambash_router)
@@ -126,8 +227,9 @@ app.router.add_get('/extra_hash', extra_hash)
         await bot.set_webhook(WEBHOOK_URL, drop_pending_updates=True)
 
         # attach webhook app
-        from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
-        SimpleRequestHandler(dp, bot).register(app, path=WEBHOOK_PATH)
+        # ack Telegram immediately; updates are processed by a bounded worker pool
+        from aiogram.webhook.aiohttp_server import setup_application
+        QueuedRequestHandler(dp, bot, pool=update_pool).register(app, path=WEBHOOK_PATH)
         setup_application(app, dp, bot=bot)
 
     return app